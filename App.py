@@ -4,16 +4,27 @@
 # 2. AI Guesses: You think of a Marvel character, and the AI tries to guess it by asking you questions.
 
 # --- Library Imports ---
+# The Gemini SDK and nest_asyncio are imported on first use to keep cold starts fast.
 import streamlit as st
-import google.generativeai as genai
-import random
 import asyncio
-import nest_asyncio
 import re
 import time
-
-# Apply the nest_asyncio patch to allow the use of asyncio.run in Streamlit.
-nest_asyncio.apply()
+import session_store
+import game_events
+import question_analytics
+import startup_artifacts
+import rerun_profiler
+import llm_cassette
+from marvel_roster import MARVEL_CHARACTERS_BY_DIFFICULTY as MARVEL_CHARACTERS
+
+# Opt-in per-run profiling, see rerun_profiler.py
+profiler = rerun_profiler.start_rerun_profile(st.session_state, st.query_params, __file__)
+
+def _rerun():
+    """Ends the run with st.rerun(), stopping the profiler first so it sees the final state."""
+    if profiler is not None:
+        profiler.stop()
+    st.rerun()
 
 # --- Page Configuration and CSS ---
 st.set_page_config(
@@ -88,36 +99,14 @@ st.markdown("""
 # --- Gemini API Configuration ---
 def configure_gemini(api_key):
     """Configures the Gemini API with the provided key."""
+    import google.generativeai as genai
+
     genai.configure(api_key=api_key)
     st.session_state.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
 
 # --- Character and Game Data ---
-# Define a list of Marvel characters with their attributes for each difficulty level.
-# This serves as the "knowledge base" for the AI and the game logic.
-MARVEL_CHARACTERS = {
-    "Easy": [
-        {"name": "Spider-Man", "attributes": ["male", "human", "super-strength", "super-agility", "web-shooter", "new-york", "avenger", "hero"]},
-        {"name": "Iron Man", "attributes": ["male", "human", "genius", "powered-suit", "avenger", "hero", "billionaire", "weaponry"]},
-        {"name": "Captain America", "attributes": ["male", "human", "super-strength", "super-soldier", "avenger", "hero", "shield", "world-war-2"]},
-        {"name": "Hulk", "attributes": ["male", "human-like", "super-strength", "scientist", "monster", "avenger", "hero", "gamma-radiation"]},
-    ],
-    "Medium": [
-        {"name": "Thor", "attributes": ["male", "asgardian", "god", "super-strength", "hammer", "avenger", "hero", "lightning"]},
-        {"name": "Black Widow", "attributes": ["female", "human", "spy", "super-agility", "avenger", "hero", "agent", "russia"]},
-        {"name": "Doctor Strange", "attributes": ["male", "human", "magic", "sorcerer", "avenger", "hero", "doctor", "new-york"]},
-        {"name": "Black Panther", "attributes": ["male", "human", "super-strength", "king", "avenger", "hero", "wakanda", "vibranium"]},
-        {"name": "Loki", "attributes": ["male", "asgardian", "god", "magic", "villain", "trickster", "thor's-brother"]},
-        {"name": "Thanos", "attributes": ["male", "alien", "super-strength", "villain", "gauntlet", "infinity-stones"]},
-    ],
-    "Hard": [
-        {"name": "Scarlet Witch", "attributes": ["female", "mutant", "magic", "reality-warping", "avenger", "hero", "chaos-magic"]},
-        {"name": "Vision", "attributes": ["male", "robot", "super-strength", "avenger", "hero", "android", "mind-stone"]},
-        {"name": "Ant-Man", "attributes": ["male", "human", "shrinking", "ant-control", "avenger", "hero", "ex-con"]},
-        {"name": "The Wasp", "attributes": ["female", "human", "shrinking", "avenger", "hero", "wings", "stings"]},
-        {"name": "Winter Soldier", "attributes": ["male", "human", "super-strength", "assassin", "anti-hero", "metal-arm", "world-war-2"]},
-        {"name": "Nebula", "attributes": ["female", "cyborg", "villain", "avenger", "assassin", "thanos-daughter"]},
-    ]
-}
+# The roster lives in marvel_roster.py; derived lookups are prebuilt by startup_artifacts.py.
+ROSTER_INDEX = startup_artifacts.load_roster_index()
 
 # --- Game Functions ---
 
@@ -144,7 +133,15 @@ def _initialize_session_state():
     if "first_turn" not in st.session_state:
         st.session_state.first_turn = True
     if "api_key_valid" not in st.session_state:
-        st.session_state.api_key_valid = False
+        # Replayed LLM calls don't need a key
+        st.session_state.api_key_valid = llm_cassette.replaying()
+
+# Session state keys that make up a game, saved to the session store after every run.
+# The Gemini model and API key are deliberately left out.
+GAME_STATE_KEYS = [
+    "game_mode", "difficulty", "conversation_history", "secret_character", "game_active",
+    "guesses_left", "ai_known_attributes", "ai_question", "ai_possible_characters", "first_turn",
+]
 
 def _new_game():
     """Resets the game state and starts a new game based on selected mode."""
@@ -157,16 +154,27 @@ def _new_game():
     # Initialize state for AI Guesses mode
     if st.session_state.game_mode == "AI Guesses":
         st.session_state.ai_possible_characters = MARVEL_CHARACTERS[st.session_state.difficulty].copy()
-        asyncio.run(_generate_ai_question_and_guess())
+        _run_async(_generate_ai_question_and_guess())
         st.session_state.conversation_history.append({"role": "assistant", "content": st.session_state.ai_question})
         
     # Initialize state for You Guess mode
     else:
-        st.session_state.secret_character = random.choice(MARVEL_CHARACTERS[st.session_state.difficulty])
+        st.session_state.secret_character = llm_cassette.get_random().choice(MARVEL_CHARACTERS[st.session_state.difficulty])
         st.session_state.conversation_history.append(
             {"role": "assistant", "content": f"I've picked a character from the **{st.session_state.difficulty}** list. You have {st.session_state.guesses_left} chances to guess who I am! What's your first question?"}
         )
 
+def _log_game_event(kind, **fields):
+    """Records a game event tagged with this session and game mode."""
+    game_events.log_event(
+        kind,
+        session=st.session_state.get("session_token"),
+        app="chat",
+        mode="ai_guesses" if st.session_state.game_mode == "AI Guesses" else "you_guess",
+        turn=sum(1 for message in st.session_state.conversation_history if message["role"] == "user"),
+        **fields
+    )
+
 def _display_chat():
     """Displays the entire conversation history in the chat UI."""
     for message in st.session_state.conversation_history:
@@ -175,17 +183,31 @@ def _display_chat():
 
 # --- Asynchronous API Call Functions ---
 
-async def _get_gemini_response(prompt):
-    """Makes an asynchronous call to the Gemini API."""
+def _run_async(coroutine):
+    """Runs a coroutine to completion from the script thread."""
+    # Apply the nest_asyncio patch to allow the use of asyncio.run in Streamlit.
+    import nest_asyncio
+
+    nest_asyncio.apply()
+    return asyncio.run(coroutine)
+
+@llm_cassette.cassette("_get_gemini_response", ignore=("hints",), on_miss=lambda error: f"An error occurred: {error}")
+async def _get_gemini_response(prompt, hints=""):
+    """Makes an asynchronous call to the Gemini API.
+
+    `hints` is appended to the prompt but kept out of the cassette fingerprint, since it
+    comes from question_stats.json and changes whenever the stats are re-exported.
+    """
     try:
         if "model" not in st.session_state:
             st.error("API model not configured. Please enter a valid API key.")
             return "Error"
-        response = await asyncio.to_thread(st.session_state.model.generate_content, prompt)
+        response = await asyncio.to_thread(st.session_state.model.generate_content, f"{prompt} {hints}".strip())
         return response.text
     except Exception as e:
         return f"An error occurred: {e}"
 
+@llm_cassette.cassette("_get_gemini_yes_no", on_miss=lambda error: f"An error occurred: {error}")
 async def _get_gemini_yes_no(question, character_name, character_attributes):
     """Asks the API to provide a yes/no answer for a character based on its attributes."""
     prompt = (
@@ -210,6 +232,9 @@ async def _generate_ai_question_and_guess():
     known_attributes = st.session_state.ai_known_attributes
     prompt_context = f"So far, I know the character is: {', '.join(known_attributes)}. " if known_attributes else ""
     character_names = ', '.join([c['name'] for c in st.session_state.ai_possible_characters])
+    # Questions that split the characters well in past games, from question_analytics.py
+    proven_questions = question_analytics.top_questions(question_analytics.load_question_stats(), "ai_questions")
+    proven_context = f"Questions that worked well in past games include: {'; '.join(proven_questions)}. " if proven_questions else ""
 
     prompt = (
         f"I am playing a 20-questions game. The possible characters are: {character_names}. "
@@ -220,7 +245,7 @@ async def _generate_ai_question_and_guess():
         "Start your response with 'Is the character...'. Do not ask a question that has already been asked."
     )
     
-    response = await _get_gemini_response(prompt)
+    response = await _get_gemini_response(prompt, hints=proven_context)
     st.session_state.ai_question = response
 
 def _handle_ai_guess_response(user_answer):
@@ -230,18 +255,21 @@ def _handle_ai_guess_response(user_answer):
     
     if "Can I make my final guess?" in st.session_state.ai_question:
         if user_answer == "Yes":
-            final_guess = random.choice(st.session_state.ai_possible_characters)
+            final_guess = llm_cassette.get_random().choice(st.session_state.ai_possible_characters)
+            # The player only agreed to a guess; whether it was right is never confirmed
+            _log_game_event("guess", answer=final_guess['name'])
             st.session_state.conversation_history.append({"role": "assistant", "content": f"My final guess is **{final_guess['name']}**!"})
             st.session_state.game_active = False
             st.balloons()
             time.sleep(2)
         else:
             st.session_state.conversation_history.append({"role": "assistant", "content": "Darn! Okay, let me ask another question."})
-            asyncio.run(_generate_ai_question_and_guess())
+            _run_async(_generate_ai_question_and_guess())
             st.session_state.conversation_history.append({"role": "assistant", "content": st.session_state.ai_question})
         return
 
     question_text = st.session_state.ai_question
+    _log_game_event("question", question=question_text, answer=user_answer)
     if user_answer.lower() == "yes":
         # Extract attribute from the AI's question to filter characters.
         # This is a simple, rule-based approach for common attributes.
@@ -262,17 +290,19 @@ def _handle_ai_guess_response(user_answer):
             ]
         
     st.session_state.conversation_history.append({"role": "assistant", "content": "Okay, let me think."})
-    asyncio.run(_generate_ai_question_and_guess())
+    _run_async(_generate_ai_question_and_guess())
     st.session_state.conversation_history.append({"role": "assistant", "content": st.session_state.ai_question})
 
 def _handle_human_guess(user_guess):
     """Processes the user's guess in You Guess mode."""
     st.session_state.guesses_left -= 1
     guess_cleaned = user_guess.strip().lower()
+    _log_game_event("guess", character=st.session_state.secret_character['name'], answer=user_guess)
 
     if guess_cleaned == st.session_state.secret_character['name'].lower():
         st.session_state.conversation_history.append({"role": "assistant", "content": f"That's right! The character was **{st.session_state.secret_character['name']}**! You win!"})
         st.session_state.game_active = False
+        _log_game_event("outcome", character=st.session_state.secret_character['name'], outcome="win")
         st.balloons()
         st.snow()
     elif st.session_state.guesses_left > 0:
@@ -280,6 +310,7 @@ def _handle_human_guess(user_guess):
     else:
         st.session_state.conversation_history.append({"role": "assistant", "content": f"You're out of guesses! The character was **{st.session_state.secret_character['name']}**. Better luck next time!"})
         st.session_state.game_active = False
+        _log_game_event("outcome", character=st.session_state.secret_character['name'], outcome="lose")
         st.error("😭")
         st.error("😞")
         st.error("😔")
@@ -287,10 +318,14 @@ def _handle_human_guess(user_guess):
 
 def _handle_human_question(question_text):
     """Processes the user's yes/no question in You Guess mode."""
-    response_text = asyncio.run(_get_gemini_yes_no(question_text, st.session_state.secret_character['name'], st.session_state.secret_character['attributes']))
+    response_text = _run_async(_get_gemini_yes_no(question_text, st.session_state.secret_character['name'], st.session_state.secret_character['attributes']))
     st.session_state.conversation_history.append({"role": "assistant", "content": response_text})
+    _log_game_event("question", character=st.session_state.secret_character['name'], question=question_text, answer=response_text)
 
 # --- Streamlit App UI ---
+# Pick up a game saved under the token in the URL, e.g. after a restart or on another replica
+if "session_token" not in st.session_state:
+    session_store.restore_session(st.session_state, st.query_params, GAME_STATE_KEYS)
 _initialize_session_state()
 
 st.title("Guess the Marvel Character")
@@ -299,7 +334,7 @@ st.markdown("I'm thinking of a Marvel character. Can you guess who it is?")
 # API Key input section
 with st.container():
     api_key = st.text_input("Enter your Gemini API Key:", type="password")
-    if st.button("Submit Key"):
+    if st.button("Submit Key", key="submit_key_button"):
         if api_key:
             try:
                 configure_gemini(api_key)
@@ -318,19 +353,20 @@ if st.session_state.api_key_valid:
         st.session_state.game_mode = st.radio(
             "Choose Game Mode:",
             options=["You Guess", "AI Guesses"],
+            index=["You Guess", "AI Guesses"].index(st.session_state.game_mode),
             help="In 'You Guess' mode, you ask questions. In 'AI Guesses' mode, you answer questions."
         )
 
         st.session_state.difficulty = st.selectbox(
             "Select Difficulty:",
             options=["Easy", "Medium", "Hard"],
-            index=0,
+            index=["Easy", "Medium", "Hard"].index(st.session_state.difficulty),
             help="Easy: 4 characters, Medium: 6 characters, Hard: 6 characters"
         )
 
-        if st.button("New Game", type="primary"):
+        if st.button("New Game", key="new_game_button", type="primary"):
             _new_game()
-            st.rerun()
+            _rerun()
 
     # --- Main Game Loop and UI ---
     if not st.session_state.game_active:
@@ -350,12 +386,12 @@ if st.session_state.api_key_valid:
                     st.session_state.conversation_history.append(user_message)
 
                     # Differentiate between a question and a guess
-                    is_guess = any(char['name'].lower() in prompt.lower() for char in MARVEL_CHARACTERS[st.session_state.difficulty])
+                    is_guess = any(name in prompt.lower() for name in ROSTER_INDEX["lowercase_names_by_difficulty"][st.session_state.difficulty])
                     if "guess" in prompt.lower() or is_guess:
                         _handle_human_guess(prompt)
                     else:
                         _handle_human_question(prompt)
-                    st.rerun()
+                    _rerun()
 
         else: # AI Guesses mode
             if st.session_state.game_active:
@@ -367,20 +403,26 @@ if st.session_state.api_key_valid:
                     with col1:
                         if st.button("Yes", key="final_guess_yes"):
                             _handle_ai_guess_response("Yes")
-                            st.rerun()
+                            _rerun()
                     with col2:
                         if st.button("No", key="final_guess_no"):
                             _handle_ai_guess_response("No")
-                            st.rerun()
+                            _rerun()
                 else:
                     col1, col2 = st.columns(2)
                     with col1:
                         if st.button("Yes", key="answer_yes"):
                             _handle_ai_guess_response("Yes")
-                            st.rerun()
+                            _rerun()
                     with col2:
                         if st.button("No", key="answer_no"):
                             _handle_ai_guess_response("No")
-                            st.rerun()
+                            _rerun()
+
+session_store.persist_session(st.session_state, GAME_STATE_KEYS)
+
+if profiler is not None:
+    profiler.stop()
+    rerun_profiler.render_summary()
 
 # End of code block marker
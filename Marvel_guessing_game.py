@@ -1,212 +1,39 @@
 import streamlit as st
-import random
 import time
 import json
-import requests
-
-# A dictionary of Marvel characters with hints and structured traits.
-# Traits are now in a dictionary for more reliable computer guessing.
-MARVEL_CHARACTERS = {
-    "Iron Man": {
-        "hints": [
-            "I am a genius, billionaire, playboy, philanthropist.",
-            "My suit is powered by an arc reactor.",
-            "I am the leader of the Avengers and often referred to as 'Tony'."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_human": True,
-            "is_genius": True,
-            "uses_special_weapon": True,
-            "has_healing_factor": False
-        }
-    },
-    "Captain America": {
-        "hints": [
-            "I am a super-soldier from World War II.",
-            "My primary weapon is a vibranium shield.",
-            "I was frozen in ice for decades before being revived."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_super_soldier": True,
-            "is_human": True,
-            "uses_special_weapon": True,
-            "has_healing_factor": False
-        }
-    },
-    "Hulk": {
-        "hints": [
-            "When I get angry, I transform into a giant green monster.",
-            "I am a brilliant scientist named Bruce Banner.",
-            "My catchphrase is 'Hulk Smash!'"
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_green": True,
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": True
-        }
-    },
-    "Thor": {
-        "hints": [
-            "I am a prince from Asgard, often called the God of Thunder.",
-            "My primary weapon is a powerful hammer, Mjolnir.",
-            "I have a brother named Loki."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_god": True,
-            "uses_special_weapon": True,
-            "has_healing_factor": False
-        }
-    },
-    "Black Widow": {
-        "hints": [
-            "I am a highly skilled spy and assassin.",
-            "I have a red-colored hair.",
-            "I am a founding member of the Avengers, but I don't have superpowers."
-        ],
-        "traits": {
-            "is_male": False,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": False
-        }
-    },
-    "Spider-Man": {
-        "hints": [
-            "My powers come from a radioactive spider bite.",
-            "I can shoot webs from my wrists.",
-            "My alter-ego is Peter Parker."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": False, # He is often an ally, but not always a core Avenger
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": True
-        }
-    },
-    "Black Panther": {
-        "hints": [
-            "I am the king and protector of the fictional African nation of Wakanda.",
-            "My suit is made of vibranium.",
-            "I have a sister named Shuri."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_king": True,
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": False
-        }
-    },
-    "Doctor Strange": {
-        "hints": [
-            "I am a Master of the Mystic Arts.",
-            "I was a brilliant surgeon before my accident.",
-            "My cloak has a life of its own."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_sorcerer": True,
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": False
-        }
-    },
-    "Ant-Man": {
-        "hints": [
-            "I can shrink to the size of an ant and also become a giant.",
-            "My suit is made by Dr. Hank Pym.",
-            "My alter-ego is Scott Lang."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_human": True,
-            "uses_special_weapon": False,
-            "has_healing_factor": False
-        }
-    },
-    "Captain Marvel": {
-        "hints": [
-            "I was a U.S. Air Force pilot.",
-            "I can fly and shoot energy blasts from my hands.",
-            "My real name is Carol Danvers."
-        ],
-        "traits": {
-            "is_male": False,
-            "is_hero": True,
-            "is_avenger": True,
-            "is_human": False, # Kree DNA
-            "uses_special_weapon": False,
-            "has_healing_factor": False
-        }
-    },
-    "Wolverine": {
-        "hints": [
-            "I have adamantium claws and an incredible healing factor.",
-            "I am part of the X-Men.",
-            "My real name is Logan."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": True,
-            "is_avenger": False,
-            "is_mutant": True,
-            "is_human": False,
-            "uses_special_weapon": True,
-            "has_healing_factor": True
-        }
-    },
-    "Deadpool": {
-        "hints": [
-            "I am a merc with a mouth and I know I'm in a comic book.",
-            "I have an incredible healing factor.",
-            "My alter-ego is Wade Wilson."
-        ],
-        "traits": {
-            "is_male": True,
-            "is_hero": False, # Anti-hero
-            "is_avenger": False,
-            "is_human": True,
-            "uses_special_weapon": True,
-            "has_healing_factor": True
-        }
-    }
-}
-
-# Questions for the computer to ask, mapped to the new traits
-COMPUTER_QUESTIONS = {
-    "is_male": "Is your character a male?",
-    "is_avenger": "Is your character an Avenger?",
-    "is_hero": "Is your character a hero?",
-    "uses_special_weapon": "Does your character use a special weapon?",
-    "has_healing_factor": "Does your character have a healing factor?",
-    "is_human": "Is your character human?",
-}
-
-def gemini_answer_question(question, character_name):
-    """Answers a user's question using the Gemini API."""
+import bayesian_guesser
+import session_store
+import game_events
+import question_analytics
+import character_assets
+import startup_artifacts
+import rerun_profiler
+import llm_cassette
+import game_rooms
+import answer_warmup
+from marvel_roster import MARVEL_CHARACTERS, COMPUTER_QUESTIONS
+
+# Index structures for the computer's probabilistic guessing, prebuilt by startup_artifacts.py
+ROSTER_INDEX = startup_artifacts.load_roster_index()
+CHARACTER_NAMES = ROSTER_INDEX["character_names"]
+QUESTION_KEYS = ROSTER_INDEX["question_keys"]
+TRAIT_MATRIX = ROSTER_INDEX["trait_matrix"]
+# How well each question separated characters in past games, used to break ties
+QUESTION_PRIORITY = question_analytics.question_priority(question_analytics.load_question_stats(), QUESTION_KEYS)
+
+# Answers returned when the API call fails; these are never shared with other players
+GEMINI_FAILURE_ANSWERS = ("I couldn't process that question.", "I am unable to answer at this time. Please try again.")
+ROOM_MODE = "Play in a room"
+
+@llm_cassette.cassette("gemini_answer_question")
+def request_gemini_answer(question, character_name):
+    """Asks the Gemini API to answer a user's question. Raises if the request fails.
+
+    Doesn't touch Streamlit, so warm-up threads can call it outside a script run.
+    """
+    # Imported here so the HTTP stack isn't loaded until the first question
+    import requests
+
     character_info = MARVEL_CHARACTERS[character_name]
     traits_json = json.dumps(character_info["traits"])
 
@@ -232,23 +59,41 @@ def gemini_answer_question(question, character_name):
     api_key = "" # This will be populated by the runtime
     api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-05-20:generateContent?key={api_key}"
 
-    try:
-        response = requests.post(api_url, json=payload)
-        response.raise_for_status() # Raise an exception for bad status codes
-        response_json = response.json()
-        
-        # Extract the generated text
-        if response_json and "candidates" in response_json:
-            return response_json["candidates"][0]["content"]["parts"][0]["text"].strip()
-        else:
-            return "I couldn't process that question."
+    response = requests.post(api_url, json=payload)
+    response.raise_for_status() # Raise an exception for bad status codes
+    response_json = response.json()
+
+    # Extract the generated text
+    if response_json and "candidates" in response_json:
+        return response_json["candidates"][0]["content"]["parts"][0]["text"].strip()
+    else:
+        return GEMINI_FAILURE_ANSWERS[0]
+
+def gemini_answer_question(question, character_name, report_error=st.error):
+    """Answers a user's question using the Gemini API, reporting failures with `report_error`."""
+    import requests
 
+    try:
+        return request_gemini_answer(question, character_name)
     except requests.exceptions.RequestException as e:
-        st.error(f"A request error occurred: {e}")
-        return "I am unable to answer at this time. Please try again."
+        report_error(f"A request error occurred: {e}")
+        return GEMINI_FAILURE_ANSWERS[1]
     except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        return "I am unable to answer at this time. Please try again."
+        report_error(f"An unexpected error occurred: {e}")
+        return GEMINI_FAILURE_ANSWERS[1]
+
+def warm_answer_question(question, character_name):
+    """Answers a question on a warm-up thread, where there is no page to show errors on."""
+    return gemini_answer_question(question, character_name, report_error=lambda message: None)
+
+# Session state keys that make up a game, saved to the session store after every run
+GAME_STATE_KEYS = [
+    "game_state", "game_mode", "tries_left", "hints_given", "secret_character", "computer_guesses",
+    "current_hint_index", "computer_turn_state", "last_user_hint", "user_question_history",
+    "questions_asked", "user_guess_input_val", "possible_characters", "question_asked_this_turn",
+    "computer_questions_asked", "computer_question_history", "computer_guess_made",
+    "candidate_log_likelihoods", "room_code", "player_name",
+]
 
 def reset_game():
     """Resets the game state to its initial values."""
@@ -268,15 +113,97 @@ def reset_game():
     st.session_state.computer_questions_asked = 0
     st.session_state.computer_question_history = []
     st.session_state.computer_guess_made = False
+    st.session_state.candidate_log_likelihoods = bayesian_guesser.initial_log_likelihoods(len(CHARACTER_NAMES)).tolist()
+    st.session_state.room_code = None
+    st.session_state.answer_warmup = None
+
+def is_shareable_answer(answer):
+    """Whether an answer can be cached and reused; API failures are not."""
+    return answer not in GEMINI_FAILURE_ANSWERS
+
+def log_game_event(kind, **fields):
+    """Records a game event tagged with this session, game mode and secret character."""
+    mode = {"I'll guess": "user", ROOM_MODE: "room"}.get(st.session_state.game_mode, "computer")
+    game_events.log_event(
+        kind,
+        session=st.session_state.get("session_token"),
+        app="classic",
+        mode=mode,
+        # In computer mode the player answers about their own pick, which the app never learns
+        character=None if mode == "computer" else st.session_state.secret_character,
+        **fields
+    )
 
 def start_game():
     """Initializes the game and chooses a character."""
     st.session_state.game_state = "in_progress"
-    st.session_state.secret_character = random.choice(list(MARVEL_CHARACTERS.keys()))
+    st.session_state.secret_character = llm_cassette.get_random().choice(list(MARVEL_CHARACTERS.keys()))
+    if st.session_state.game_mode == "I'll guess":
+        # Start answering the most likely questions while the player reads and types
+        st.session_state.answer_warmup = answer_warmup.start_warmup(
+            st.session_state.secret_character, warm_answer_question, is_shareable_answer
+        )
+
+def join_room(room_code, player_name):
+    """Joins an existing room, or opens a new one if no code is given, and starts the game."""
+    room = game_rooms.get_room(room_code) if room_code else game_rooms.create_room(MARVEL_CHARACTERS.keys(), llm_cassette.get_random())
+    if room is None:
+        st.error(f"There is no room with the code {room_code.strip().upper()}.")
+        return
+    room.join(st.session_state.session_token, player_name)
+    st.session_state.room_code = room.code
+    st.session_state.player_name = player_name
+    st.session_state.game_state = "in_progress"
+    st.session_state.secret_character = room.secret_character
+
+def current_room():
+    """Returns the room this session plays in, or None for a private game."""
+    return game_rooms.get_room(st.session_state.get("room_code"))
+
+def answer_user_question(question):
+    """Answers a question, reusing answers already given to other players in the same room."""
+    room = current_room()
+    if room is None:
+        answer, _ = answer_warmup.answer(
+            st.session_state.secret_character, question, gemini_answer_question, is_shareable_answer
+        )
+        return answer
+    answer, _ = room.answer(
+        question,
+        lambda q: gemini_answer_question(q, room.secret_character),
+        cache_if=is_shareable_answer,
+    )
+    room.record_question(st.session_state.session_token)
+    return answer
+
+def show_room_leaderboard(room):
+    """Displays the room code and the players ranked by how quickly they solved it."""
+    st.info(f"Room **{room.code}** - share this code with other players. ({room.player_count()} playing)")
+    st.markdown("### Leaderboard")
+    st.table([
+        {
+            "Player": row["player"],
+            "Questions": row["questions"],
+            "Guesses": row["guesses"],
+            "Solved": "Yes" if row["solved_at"] is not None else "Not yet",
+        }
+        for row in room.leaderboard()
+    ])
 
 def user_guesses_mode():
     """Handles the game logic when the user is guessing."""
     st.subheader("Guess the Marvel Character")
+    room = current_room()
+    if room is not None:
+        show_room_leaderboard(room)
+    else:
+        # Keep warming the likely next questions, e.g. after the player's last question
+        # or for a game restored on this replica
+        warmup = st.session_state.get("answer_warmup")
+        if warmup is None or warmup.character != st.session_state.secret_character:
+            warmup = answer_warmup.Warmup(st.session_state.secret_character, warm_answer_question, is_shareable_answer)
+            st.session_state.answer_warmup = warmup
+        warmup.top_up([q for q, _ in st.session_state.user_question_history])
     
     st.write(f"Tries left: {st.session_state.tries_left}")
     
@@ -291,16 +218,17 @@ def user_guesses_mode():
         st.write(f"Use this box to ask questions and get 'Yes' or 'No' answers. ({20 - st.session_state.questions_asked} questions remaining)")
         user_question = st.text_input("Your question:", key="user_question_input")
         
-        if st.button("Ask Question"):
+        if st.button("Ask Question", key="ask_question_button"):
             if user_question:
                 st.session_state.questions_asked += 1
                 with st.spinner("Thinking..."):
-                    answer = gemini_answer_question(user_question, st.session_state.secret_character)
+                    answer = answer_user_question(user_question)
                 
                 if answer in ["Yes.", "No."]:
                     st.session_state.user_question_history.append((user_question, answer))
                 else:
                     st.session_state.user_question_history.append((user_question, answer))
+                log_game_event("question", turn=st.session_state.questions_asked, question=user_question, answer=answer)
     else:
         st.warning("You have used all 20 questions! You can no longer ask for hints.")
 
@@ -316,15 +244,20 @@ def user_guesses_mode():
     st.write("Enter the character's full name to guess.")
     user_guess = st.text_input("Your guess:", value=st.session_state.user_guess_input_val, key="user_guess_input")
     
-    if st.button("Submit Guess"):
+    if st.button("Submit Guess", key="submit_guess_button"):
         st.session_state.tries_left -= 1
         st.session_state.user_guess_input_val = ""
+        log_game_event("guess", turn=st.session_state.questions_asked, answer=user_guess)
+        if room is not None:
+            room.record_guess(st.session_state.session_token, user_guess.lower() == st.session_state.secret_character.lower())
         
         if user_guess.lower() == st.session_state.secret_character.lower():
             st.session_state.game_state = "win"
+            log_game_event("outcome", turn=st.session_state.questions_asked, outcome="win")
             st.balloons()
         elif st.session_state.tries_left <= 0:
             st.session_state.game_state = "lose"
+            log_game_event("outcome", turn=st.session_state.questions_asked, outcome="lose")
         else:
             st.error("Incorrect guess. Try again!")
 
@@ -335,56 +268,57 @@ def computer_guesses_mode():
     # Check if a guess can be made
     if st.session_state.computer_guess_made:
         st.info(f"The computer's final guess is: **{st.session_state.computer_guess_made}**")
-        st.button("Continue", on_click=lambda: st.session_state.update(computer_guess_made=False))
+        st.button("Continue", key="continue_button", on_click=lambda: st.session_state.update(computer_guess_made=False))
         return
 
     if st.session_state.computer_questions_asked >= 15:
         st.session_state.game_state = "lose"
+        log_game_event("outcome", turn=st.session_state.computer_questions_asked, outcome="lose")
         st.error(f"The computer has run out of questions and loses!")
         return
 
     st.write(f"Questions asked: {st.session_state.computer_questions_asked}/15")
     
-    # Check if the computer has enough info to make a guess
-    if len(st.session_state.possible_characters) == 1:
-        computer_guess = st.session_state.possible_characters[0]
+    log_likelihoods = st.session_state.candidate_log_likelihoods
+    asked_indices = [QUESTION_KEYS.index(q[0]) for q in st.session_state.computer_question_history]
+    candidates, confidence = bayesian_guesser.best_candidates(log_likelihoods)
+
+    # Keep asking until one character is likely enough or no question would help
+    question_index = None
+    if confidence < bayesian_guesser.GUESS_THRESHOLD:
+        question_index = bayesian_guesser.choose_question(log_likelihoods, TRAIT_MATRIX, asked_indices, QUESTION_PRIORITY)
+
+    if question_index is None:
+        computer_guess = CHARACTER_NAMES[llm_cassette.get_random().choice(candidates)]
         st.session_state.computer_guess_made = computer_guess
         if computer_guess.lower() == st.session_state.secret_character.lower():
             st.session_state.game_state = "win"
             st.balloons()
         else:
             st.session_state.game_state = "lose"
+        # The player never tells us their character, so whether the guess was right is unknown
+        log_game_event("guess", turn=st.session_state.computer_questions_asked, answer=computer_guess)
         return
     else:
-        # Computer asks a question
-        available_questions = [key for key in COMPUTER_QUESTIONS.keys() if key not in [q[0] for q in st.session_state.computer_question_history]]
-        if not available_questions:
-            st.session_state.game_state = "lose"
-            st.error("The computer is out of unique questions and loses!")
-            return
-        
-        question_key = random.choice(available_questions)
+        # Computer asks the most informative question
+        question_key = QUESTION_KEYS[question_index]
         st.session_state.question_asked_this_turn = question_key
         st.info(f"The computer asks: **{COMPUTER_QUESTIONS[question_key]}**")
         
-        user_answer = st.radio("Your answer:", ("Yes", "No"), key="user_answer_radio")
+        user_answer = st.radio("Your answer:", ("Yes", "No", "Not sure"), key="user_answer_radio")
         
-        if st.button("Submit Answer"):
+        if st.button("Submit Answer", key="submit_answer_button"):
             st.session_state.computer_questions_asked += 1
             st.session_state.computer_question_history.append((question_key, user_answer))
+            log_game_event("question", turn=st.session_state.computer_questions_asked, question=question_key, answer=user_answer)
             
-            # Update the list of possible characters based on the answer
-            new_possible_characters = []
-            
-            for char_name in st.session_state.possible_characters:
-                char_traits = MARVEL_CHARACTERS[char_name]['traits']
-                
-                # Check if the character's trait matches the question and answer
-                if (user_answer == "Yes" and char_traits.get(question_key) is True) or \
-                   (user_answer == "No" and char_traits.get(question_key) is False):
-                    new_possible_characters.append(char_name)
-
-            st.session_state.possible_characters = new_possible_characters
+            # Re-score every candidate instead of eliminating the ones that don't match,
+            # so a wrong answer or a missing trait doesn't rule out the true character
+            log_likelihoods = bayesian_guesser.update_log_likelihoods(log_likelihoods, TRAIT_MATRIX, question_index, user_answer)
+            st.session_state.candidate_log_likelihoods = log_likelihoods.tolist()
+            st.session_state.possible_characters = [
+                CHARACTER_NAMES[i] for i in bayesian_guesser.plausible_candidates(log_likelihoods)
+            ]
             st.write(f"Possible characters remaining: {len(st.session_state.possible_characters)}")
 
 def main():
@@ -445,6 +379,10 @@ def main():
     st.title("Guess the Marvel Character")
     st.markdown("---")
 
+    # Pick up a game saved under the token in the URL, e.g. after a restart or on another replica
+    if "session_token" not in st.session_state:
+        session_store.restore_session(st.session_state, st.query_params, GAME_STATE_KEYS)
+
     # Initialize session state variables if they don't exist
     if "game_state" not in st.session_state:
         reset_game()
@@ -452,16 +390,25 @@ def main():
     # Mode selection and game start
     if st.session_state.game_state == "not_started":
         st.write("Welcome to the Marvel Guessing Game! Choose your role.")
-        game_mode = st.radio("Choose a game mode:", ["I'll guess", "The computer will guess"])
+        game_mode = st.radio("Choose a game mode:", ["I'll guess", "The computer will guess", ROOM_MODE])
+        if game_mode == ROOM_MODE:
+            player_name = st.text_input("Your name:", key="player_name_input")
+            room_code = st.text_input("Room code (leave empty to open a new room):", key="room_code_input")
         
-        if st.button("Start Game"):
-            with st.spinner('Starting game...'):
-                time.sleep(1)
-            st.session_state.game_mode = game_mode
-            start_game()
+        if st.button("Start Game", key="start_game_button"):
+            if game_mode == ROOM_MODE and not player_name.strip():
+                st.error("Please enter your name to join a room.")
+            else:
+                with st.spinner('Starting game...'):
+                    time.sleep(1)
+                st.session_state.game_mode = game_mode
+                if game_mode == ROOM_MODE:
+                    join_room(room_code, player_name.strip())
+                else:
+                    start_game()
     
     elif st.session_state.game_state == "in_progress":
-        if st.session_state.game_mode == "I'll guess":
+        if st.session_state.game_mode in ("I'll guess", ROOM_MODE):
             user_guesses_mode()
         else:
             computer_guesses_mode()
@@ -475,31 +422,46 @@ def main():
                 st.write(f"  Your answer: **{answer}**")
 
     elif st.session_state.game_state == "win":
-        char_image_url = f"https://placehold.co/300x300/F0F2F6/262730?text={st.session_state.secret_character.replace(' ', '+')}"
+        char_image = character_assets.character_image(st.session_state.secret_character)
         
-        if st.session_state.game_mode == "I'll guess":
+        if st.session_state.game_mode in ("I'll guess", ROOM_MODE):
             st.success(f"You win! The character was **{st.session_state.secret_character}**.")
-            st.image(char_image_url, caption=st.session_state.secret_character)
+            st.image(char_image, caption=st.session_state.secret_character)
         else:
             st.success(f"The computer wins! The character was **{st.session_state.secret_character}**.")
-            st.image(char_image_url, caption=st.session_state.secret_character)
+            st.image(char_image, caption=st.session_state.secret_character)
 
-        st.button("Play Again", on_click=reset_game)
+        if current_room() is not None:
+            show_room_leaderboard(current_room())
+        st.button("Play Again", key="play_again_button", on_click=reset_game)
 
     elif st.session_state.game_state == "lose":
-        char_image_url = f"https://placehold.co/300x300/F0F2F6/262730?text={st.session_state.secret_character.replace(' ', '+')}"
+        char_image = character_assets.character_image(st.session_state.secret_character)
         
-        if st.session_state.game_mode == "I'll guess":
+        if st.session_state.game_mode in ("I'll guess", ROOM_MODE):
             st.error(f"You lose! The character was **{st.session_state.secret_character}**.")
-            st.image(char_image_url, caption=st.session_state.secret_character)
+            st.image(char_image, caption=st.session_state.secret_character)
         else:
             st.error(f"The computer loses! The character was **{st.session_state.secret_character}**.")
-            st.image(char_image_url, caption=st.session_state.secret_character)
+            st.image(char_image, caption=st.session_state.secret_character)
             
-        st.button("Play Again", on_click=reset_game)
+        if current_room() is not None:
+            show_room_leaderboard(current_room())
+        st.button("Play Again", key="play_again_button", on_click=reset_game)
 
     st.markdown("---")
     st.markdown("Made with ♥ by petra")
 
+    session_store.persist_session(st.session_state, GAME_STATE_KEYS)
+
 if __name__ == "__main__":
-    main()
+    # Opt-in per-run profiling, see rerun_profiler.py
+    profiler = rerun_profiler.start_rerun_profile(st.session_state, st.query_params, __file__)
+    try:
+        main()
+    finally:
+        # Also when the run is interrupted, so the next run's trigger is detected correctly
+        if profiler is not None:
+            profiler.stop()
+    if profiler is not None:
+        rerun_profiler.render_summary()
@@ -0,0 +1,137 @@
+# Predictive answer warm-up for "I'll guess" games.
+# When a game starts, the answers to the questions players are most likely to ask
+# (ranked by past question frequencies from question_analytics.py) are computed in
+# the background for the chosen secret character. They land in a process-wide answer
+# cache, so most "Ask Question" clicks return without waiting on the LLM. Each game
+# has a budget of LLM calls and seconds so warm-up can't run away with API quota.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import question_analytics
+from game_events import normalize_question
+from game_rooms import AnswerStore
+
+# Questions warmed ahead of the player at any time.
+WARMUP_TOP_K = 8
+# Per-game budget.
+WARMUP_MAX_CALLS = 16
+WARMUP_MAX_SECONDS = 180
+WARMUP_WORKERS = 4
+ANSWER_CACHE_SIZE = 5000
+
+# Used until the event log has enough games to rank real player questions.
+DEFAULT_QUESTIONS = [
+    "Is your character a male?",
+    "Is your character an Avenger?",
+    "Is your character human?",
+    "Is your character a hero?",
+    "Does your character use a special weapon?",
+    "Does your character have a healing factor?",
+    "Can your character fly?",
+    "Is your character a villain?",
+    "Does your character have superpowers?",
+    "Is your character a god?",
+]
+
+_answer_cache = AnswerStore(max_entries=ANSWER_CACHE_SIZE)
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="answer-warmup")
+        return _executor
+
+def _cache_key(character, question):
+    return f"{character}\n{normalize_question(question)}"
+
+def likely_questions(asked=(), limit=WARMUP_TOP_K):
+    """Returns the most frequently asked questions the player hasn't asked yet."""
+    stats = question_analytics.load_question_stats()
+    ranked = question_analytics.top_questions(stats, "user_questions", limit=question_analytics.TOP_N)
+    asked = {normalize_question(q) for q in asked}
+    candidates = []
+    for question in ranked + DEFAULT_QUESTIONS:
+        normalized = normalize_question(question)
+        if normalized not in asked:
+            asked.add(normalized)
+            candidates.append(question)
+        if len(candidates) == limit:
+            break
+    return candidates
+
+def answer(character, question, compute, cache_if=lambda answer: True):
+    """Answers a question from the cache, or with `compute(question, character)` on a miss.
+
+    Returns (answer, shared), where shared is True if the answer was already cached or
+    being computed. If warm-up is still working on the same question, this waits for
+    that call instead of making a second one.
+    """
+    return _answer_cache.answer(
+        _cache_key(character, question), lambda: compute(question, character), cache_if
+    )
+
+class Warmup:
+    """Background warm-up for one game's secret character."""
+
+    def __init__(self, character, compute, cache_if=lambda answer: True,
+                 max_calls=WARMUP_MAX_CALLS, max_seconds=WARMUP_MAX_SECONDS):
+        self.character = character
+        self.compute = compute
+        self.cache_if = cache_if
+        self.max_calls = max_calls
+        # LLM calls this warm-up actually made, and questions waiting in the executor
+        self.calls_used = 0
+        self.queued = 0
+        self.deadline = time.monotonic() + max_seconds
+        self._scheduled = set()
+        self._lock = threading.Lock()
+
+    def top_up(self, asked=()):
+        """Schedules the likely next questions that aren't cached, in flight or queued yet.
+
+        Called on every rerun, so warm-up keeps going while the player types.
+        Returns how many questions were scheduled.
+        """
+        if time.monotonic() > self.deadline:
+            return 0
+        scheduled = 0
+        for question in likely_questions(asked):
+            key = _cache_key(self.character, question)
+            with self._lock:
+                # Queued questions may still end up calling the LLM, so they count until they run
+                if self.calls_used + self.queued >= self.max_calls:
+                    break
+                if key in self._scheduled or _answer_cache.is_pending(key):
+                    continue
+                self._scheduled.add(key)
+                self.queued += 1
+            scheduled += 1
+            _get_executor().submit(self._warm, question)
+        return scheduled
+
+    def _count_call(self, question, character):
+        with self._lock:
+            self.calls_used += 1
+        return self.compute(question, character)
+
+    def _warm(self, question):
+        try:
+            if time.monotonic() <= self.deadline:
+                answer(self.character, question, self._count_call, self.cache_if)
+        except Exception:
+            # Warm-up is best effort; the player's own click will retry the question
+            pass
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+def start_warmup(character, compute, cache_if=lambda answer: True):
+    """Starts warming answers for a new game and returns its handle."""
+    warmup = Warmup(character, compute, cache_if)
+    warmup.top_up()
+    return warmup
@@ -0,0 +1,102 @@
+# Probabilistic candidate scoring for the "The computer will guess" mode.
+# Instead of eliminating characters outright, every candidate keeps a log-likelihood
+# that is updated after each answer. A wrong answer only lowers the true character's
+# score, and a trait missing from a character's dict counts as "unknown".
+
+import numpy as np
+
+# Probability that the user gives the wrong answer to a question.
+ANSWER_NOISE = 0.05
+# Probability of a "Yes" for a trait that is missing from a character's dict.
+UNKNOWN_TRAIT_YES_PROBABILITY = 0.5
+# The computer makes its guess once the top candidate passes this posterior.
+GUESS_THRESHOLD = 0.8
+# Below this expected information gain (in nats) another question is not worth asking.
+MIN_INFORMATION_GAIN = 1e-3
+# Characters below this posterior are no longer shown as possible.
+PLAUSIBLE_POSTERIOR = 0.01
+
+ANSWERS = ("Yes", "No")
+
+# --- Trait Matrix ---
+
+def build_trait_matrix(characters, trait_keys):
+    """Builds an int8 matrix of 1 (True), 0 (False) and -1 (unknown) traits."""
+    matrix = np.full((len(characters), len(trait_keys)), -1, dtype=np.int8)
+    for row, traits in enumerate(c["traits"] for c in characters.values()):
+        for col, key in enumerate(trait_keys):
+            value = traits.get(key)
+            if value is not None:
+                matrix[row, col] = 1 if value else 0
+    return matrix
+
+def yes_probabilities(trait_matrix, noise=ANSWER_NOISE):
+    """Returns P(answer is "Yes" | character) for every character and question."""
+    # Indexed by trait value + 1, i.e. [unknown, False, True].
+    lookup = np.array([UNKNOWN_TRAIT_YES_PROBABILITY, noise, 1.0 - noise])
+    return lookup[trait_matrix + 1]
+
+# --- Scoring ---
+
+def initial_log_likelihoods(num_characters):
+    """Returns a uniform log-likelihood vector for a new game."""
+    return np.zeros(num_characters)
+
+def update_log_likelihoods(log_likelihoods, trait_matrix, question_index, answer, noise=ANSWER_NOISE):
+    """Adds the log-probability of the given answer to every candidate's score."""
+    log_likelihoods = np.asarray(log_likelihoods, dtype=float)
+    if answer not in ANSWERS:
+        # "Not sure" carries no information about the character.
+        return log_likelihoods
+    p_yes = yes_probabilities(trait_matrix[:, question_index], noise)
+    return log_likelihoods + np.log(p_yes if answer == "Yes" else 1.0 - p_yes)
+
+def posterior(log_likelihoods):
+    """Normalizes log-likelihoods into a probability distribution over characters."""
+    log_likelihoods = np.asarray(log_likelihoods, dtype=float)
+    weights = np.exp(log_likelihoods - log_likelihoods.max())
+    return weights / weights.sum()
+
+def _entropy(probabilities, axis=0):
+    """Shannon entropy in nats, treating 0 * log(0) as 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(probabilities > 0, probabilities * np.log(probabilities), 0.0)
+    return -terms.sum(axis=axis)
+
+def expected_information_gain(probabilities, trait_matrix, noise=ANSWER_NOISE):
+    """Returns the expected entropy reduction of asking each question."""
+    p_yes = yes_probabilities(trait_matrix, noise)
+    joint_yes = probabilities[:, None] * p_yes
+    joint_no = probabilities[:, None] * (1.0 - p_yes)
+    marginal_yes = joint_yes.sum(axis=0)
+    marginal_no = joint_no.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy_yes = _entropy(np.nan_to_num(joint_yes / marginal_yes))
+        entropy_no = _entropy(np.nan_to_num(joint_no / marginal_no))
+    expected_entropy = marginal_yes * entropy_yes + marginal_no * entropy_no
+    return _entropy(probabilities) - expected_entropy
+
+def choose_question(log_likelihoods, trait_matrix, asked_indices, priority=None, noise=ANSWER_NOISE):
+    """Picks the unasked question with the highest expected information gain.
+
+    Ties are broken by `priority` (e.g. how well each question worked in past games).
+    Returns None when every question has been asked or none of them is informative.
+    """
+    gains = expected_information_gain(posterior(log_likelihoods), trait_matrix, noise)
+    gains[list(asked_indices)] = -np.inf
+    if gains.max() < MIN_INFORMATION_GAIN:
+        return None
+    if priority is None:
+        return int(np.argmax(gains))
+    tied = np.isclose(gains, gains.max())
+    return int(np.argmax(np.where(tied, np.asarray(priority, dtype=float), -np.inf)))
+
+def best_candidates(log_likelihoods):
+    """Returns the indices of the top-scoring characters and their posterior."""
+    probabilities = posterior(log_likelihoods)
+    top = probabilities.max()
+    return np.flatnonzero(np.isclose(probabilities, top)).tolist(), float(top)
+
+def plausible_candidates(log_likelihoods, floor=PLAUSIBLE_POSTERIOR):
+    """Returns the indices of characters that are still reasonably likely."""
+    return np.flatnonzero(posterior(log_likelihoods) >= floor).tolist()
@@ -0,0 +1,109 @@
+# Local character images for the win/lose screens.
+# Hand-made images can be dropped into assets/characters/<slug>.png (or .jpg); any
+# character without one gets a generated placeholder card. Thumbnails are rendered
+# once into build/characters/, and the PNG bytes are kept in a small in-memory cache
+# so a rerun never touches the network.
+#
+# Usage: python character_assets.py   (pre-renders every thumbnail, e.g. at deploy time)
+
+import functools
+import io
+import os
+import re
+import textwrap
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(APP_DIR, "assets", "characters")
+THUMBNAIL_DIR = os.path.join(APP_DIR, "build", "characters")
+THUMBNAIL_SIZE = (300, 300)
+# Number of thumbnails kept in memory per process.
+THUMBNAIL_CACHE_SIZE = 64
+# Same colors as the old placehold.co images.
+BACKGROUND_COLOR = "#F0F2F6"
+TEXT_COLOR = "#262730"
+
+def character_slug(name):
+    """Turns a character name into a file-name friendly slug, e.g. "Spider-Man" -> "spider-man"."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def _load_font(size):
+    """Returns a scalable default font, or the bitmap one on older Pillow versions."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def render_placeholder(name, size=THUMBNAIL_SIZE):
+    """Draws a plain card with the character's name centered on it."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", size, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    font = _load_font(size[1] // 9)
+    text = "\n".join(textwrap.wrap(name, width=12))
+    box = draw.multiline_textbbox((0, 0), text, font=font, align="center")
+    position = ((size[0] - (box[2] - box[0])) / 2 - box[0], (size[1] - (box[3] - box[1])) / 2 - box[1])
+    draw.multiline_text(position, text, fill=TEXT_COLOR, font=font, align="center")
+    return image
+
+def _source_image(name):
+    """Loads a hand-made image for the character if there is one."""
+    from PIL import Image
+
+    for extension in (".png", ".jpg", ".jpeg", ".webp"):
+        path = os.path.join(SOURCE_DIR, character_slug(name) + extension)
+        if os.path.exists(path):
+            return Image.open(path).convert("RGB")
+    return None
+
+def render_thumbnail(name, size=THUMBNAIL_SIZE):
+    """Returns PNG bytes of the character's image resized and cropped to `size`."""
+    # Pillow is only needed when a thumbnail hasn't been rendered yet
+    from PIL import Image, ImageOps
+
+    source = _source_image(name)
+    image = ImageOps.fit(source, size, Image.LANCZOS) if source else render_placeholder(name, size)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+def thumbnail_path(name):
+    """Where the pre-rendered thumbnail for a character lives on disk."""
+    return os.path.join(THUMBNAIL_DIR, character_slug(name) + ".png")
+
+def prerender_thumbnails(names, force=False):
+    """Renders thumbnails for all characters that don't have one on disk yet."""
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    rendered = 0
+    for name in names:
+        path = thumbnail_path(name)
+        if force or not os.path.exists(path):
+            data = render_thumbnail(name)
+            # Write to a temporary file first so another replica never reads half a file
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            rendered += 1
+    return rendered
+
+@functools.lru_cache(maxsize=THUMBNAIL_CACHE_SIZE)
+def character_image(name):
+    """Returns the character's thumbnail as PNG bytes, rendering it on first use."""
+    path = thumbnail_path(name)
+    if not os.path.exists(path):
+        try:
+            prerender_thumbnails([name])
+        except OSError:
+            # Read-only filesystem: serve the image straight from memory
+            return render_thumbnail(name)
+    with open(path, "rb") as f:
+        return f.read()
+
+if __name__ == "__main__":
+    from marvel_roster import MARVEL_CHARACTERS, MARVEL_CHARACTERS_BY_DIFFICULTY
+
+    names = set(MARVEL_CHARACTERS) | {c["name"] for level in MARVEL_CHARACTERS_BY_DIFFICULTY.values() for c in level}
+    count = prerender_thumbnails(sorted(names), force=True)
+    print(f"Rendered {count} thumbnails into {THUMBNAIL_DIR}")
@@ -0,0 +1,124 @@
+# Append-only log of game events (questions, answers, guesses and outcomes).
+# Events are queued in memory and written to SQLite in batches by a background
+# thread, so logging never blocks a script run. The log feeds question_analytics.py.
+#
+# The database path is set with MARVEL_EVENT_LOG; set it to "off" to disable logging.
+
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_EVENT_LOG_PATH = "marvel_events.db"
+FLUSH_BATCH_SIZE = 256
+FLUSH_INTERVAL_SECONDS = 1.0
+# Events are dropped rather than blocking the game if the writer falls this far behind.
+MAX_QUEUED_EVENTS = 10_000
+
+EVENT_FIELDS = ("ts", "session", "app", "mode", "kind", "turn", "character", "question", "answer", "outcome")
+
+def normalize_question(question):
+    """Lowercases a question and strips punctuation so equivalent questions match."""
+    return " ".join(re.findall(r"[a-z0-9'-]+", question.lower()))
+
+class EventLog:
+    """Buffers game events and writes them to SQLite in the background."""
+
+    def __init__(self, path=DEFAULT_EVENT_LOG_PATH, batch_size=FLUSH_BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(MAX_QUEUED_EVENTS)
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS game_events ("
+            "ts REAL NOT NULL, session TEXT, app TEXT, mode TEXT, kind TEXT NOT NULL, turn INTEGER, "
+            "character TEXT, question TEXT, answer TEXT, outcome TEXT)"
+        )
+        self._connection.commit()
+
+        self._writer = threading.Thread(target=self._write_behind, name="event-log-writer", daemon=True)
+        self._writer.start()
+
+    def log(self, kind, **fields):
+        """Queues one event. Unknown fields are ignored."""
+        fields["kind"] = kind
+        fields.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(tuple(fields.get(name) for name in EVENT_FIELDS))
+        except queue.Full:
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """Writes every queued event in one transaction."""
+        with self._flush_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            placeholders = ", ".join("?" for _ in EVENT_FIELDS)
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT INTO game_events ({', '.join(EVENT_FIELDS)}) VALUES ({placeholders})", batch
+                )
+
+    def _write_behind(self):
+        """Background loop that flushes the queue every interval or once a batch is full."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+class _DisabledEventLog:
+    """Stand-in used when MARVEL_EVENT_LOG is "off"."""
+
+    def log(self, kind, **fields):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+_event_log = None
+_event_log_lock = threading.Lock()
+
+def get_event_log():
+    """Returns the process-wide event log configured by the environment."""
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            path = os.environ.get("MARVEL_EVENT_LOG", DEFAULT_EVENT_LOG_PATH)
+            if path.lower() == "off":
+                _event_log = _DisabledEventLog()
+            else:
+                _event_log = EventLog(path)
+                atexit.register(_event_log.close)
+        return _event_log
+
+def log_event(kind, **fields):
+    """Queues an event on the process-wide event log."""
+    get_event_log().log(kind, **fields)
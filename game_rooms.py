@@ -0,0 +1,177 @@
+# Shared rooms: many players guessing the same secret character.
+# Each room keeps one answer store, so a question answered by the LLM for one player
+# is reused for everyone else in the room, and concurrent askers of the same question
+# wait on a single in-flight call instead of each making their own. Reads of answers
+# and of the leaderboard don't take a lock; the lock is only held briefly on a miss.
+#
+# Rooms live in the process that created them, so with several replicas the load
+# balancer should route a room code to the same replica.
+
+import random
+import string
+import threading
+import time
+from concurrent.futures import Future
+
+from game_events import normalize_question
+
+ROOM_CODE_LENGTH = 4
+# Rooms nobody has touched for this long are removed.
+ROOM_TTL_SECONDS = 6 * 60 * 60
+
+class AnswerStore:
+    """Answers keyed by question, computed at most once per key.
+
+    Concurrent callers asking for the same missing key wait on one in-flight
+    computation. Reads of stored answers don't take a lock. With `max_entries`
+    the oldest answers are dropped first.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._answers = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def is_pending(self, key):
+        return key in self._answers or key in self._in_flight
+
+    def answer(self, key, compute, cache_if=lambda answer: True):
+        """Returns (answer, shared), calling `compute()` only if no one else has.
+
+        `shared` is True when the answer was already stored or computed by another
+        caller. Answers rejected by `cache_if` (e.g. API errors) are returned but not stored.
+        """
+        answer = self._answers.get(key)
+        if answer is not None:
+            return answer, True
+
+        with self._lock:
+            answer = self._answers.get(key)
+            if answer is not None:
+                return answer, True
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result(), True
+
+        try:
+            answer = compute()
+            if cache_if(answer):
+                self._store(key, answer)
+            future.set_result(answer)
+            return answer, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _store(self, key, answer):
+        with self._lock:
+            self._answers[key] = answer
+            while self.max_entries is not None and len(self._answers) > self.max_entries:
+                self._answers.pop(next(iter(self._answers)))
+
+    def __len__(self):
+        return len(self._answers)
+
+class Room:
+    """One secret character, its shared answers and its players' scores."""
+
+    def __init__(self, code, secret_character):
+        self.code = code
+        self.secret_character = secret_character
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self._answers = AnswerStore()
+        # Scores keyed by the player's session token; names are only for display
+        self._players = {}
+        self._players_lock = threading.Lock()
+        # Bumped on every score change, so the leaderboard is only re-sorted when needed
+        self._version = 0
+        self._leaderboard = (None, [])
+
+    # --- Answers ---
+
+    def answer(self, question, compute, cache_if=lambda answer: True):
+        """Returns (answer, shared) for a question, calling `compute(question)` at most once.
+
+        `shared` is True when the answer came from another player's question.
+        """
+        self.last_active = time.time()
+        return self._answers.answer(normalize_question(question), lambda: compute(question), cache_if)
+
+    # --- Players and Leaderboard ---
+
+    def join(self, player_id, name):
+        """Adds a player, keeping their score if they rejoin from the same session."""
+        self.last_active = time.time()
+        with self._players_lock:
+            score = self._players.get(player_id)
+            if score is None:
+                self._players[player_id] = {"player": name, "questions": 0, "guesses": 0, "solved_at": None}
+            else:
+                score["player"] = name
+            self._version += 1
+
+    # Scores are updated under a lock so concurrent players never lose an update;
+    # the leaderboard reads them without one.
+
+    def record_question(self, player_id):
+        with self._players_lock:
+            self._players[player_id]["questions"] += 1
+            self._version += 1
+
+    def record_guess(self, player_id, correct):
+        with self._players_lock:
+            score = self._players[player_id]
+            score["guesses"] += 1
+            if correct and score["solved_at"] is None:
+                score["solved_at"] = time.time() - self.created_at
+            self._version += 1
+
+    def leaderboard(self, limit=10):
+        """Players who solved it first, ranked by questions plus guesses, then time."""
+        version, rows = self._leaderboard
+        if version != self._version:
+            version = self._version
+            rows = sorted((dict(score) for score in list(self._players.values())), key=lambda s: (
+                s["solved_at"] is None,
+                s["questions"] + s["guesses"],
+                s["solved_at"] or 0,
+            ))
+            self._leaderboard = (version, rows)
+        return rows[:limit]
+
+    def player_count(self):
+        return len(self._players)
+
+# --- Room Registry ---
+
+_rooms = {}
+_rooms_lock = threading.Lock()
+
+def _prune_idle_rooms(now):
+    for code in [code for code, room in _rooms.items() if now - room.last_active > ROOM_TTL_SECONDS]:
+        del _rooms[code]
+
+def get_room(code):
+    """Returns the room with this code, or None if it doesn't exist in this process."""
+    return _rooms.get((code or "").strip().upper())
+
+def create_room(character_names, rng=random):
+    """Opens a room with a new code and a randomly chosen secret character."""
+    with _rooms_lock:
+        _prune_idle_rooms(time.time())
+        while True:
+            code = "".join(rng.choices(string.ascii_uppercase, k=ROOM_CODE_LENGTH))
+            if code not in _rooms:
+                break
+        room = Room(code, rng.choice(list(character_names)))
+        _rooms[code] = room
+        return room
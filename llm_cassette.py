@@ -0,0 +1,168 @@
+# Record/replay layer for LLM calls, for reproducible benchmarks and load tests.
+# In record mode every call to a wrapped function is stored with a fingerprint of its
+# arguments, its response and how long it took. In replay mode the responses are served
+# from the cassette without touching the network, so no API key is needed.
+#
+# Configured with environment variables:
+#   MARVEL_LLM_CASSETTE_MODE   off (default), record or replay
+#   MARVEL_LLM_CASSETTE        cassette file, default llm_cassette.jsonl.gz
+#   MARVEL_LLM_REPLAY_LATENCY  recorded (default) to sleep as long as the original call, or zero
+#   MARVEL_RANDOM_SEED         seeds the apps' random choices (secret characters, guesses)
+#                              so a replayed run asks for the same recordings
+
+import asyncio
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+DEFAULT_CASSETTE_PATH = "llm_cassette.jsonl.gz"
+MODES = ("off", "record", "replay")
+LATENCY_MODES = ("recorded", "zero")
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a call was never recorded."""
+
+def cassette_mode():
+    mode = os.environ.get("MARVEL_LLM_CASSETTE_MODE", "off").lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM cassette mode: {mode}")
+    return mode
+
+def replaying():
+    """True when LLM calls are served from the cassette instead of the API."""
+    return cassette_mode() == "replay"
+
+def fingerprint(name, args, kwargs, ignore=()):
+    """Hashes a call's function name and arguments into a short, stable key.
+
+    Keyword arguments named in `ignore` are left out, for context that may change
+    between recording and replay without changing what the call is for.
+    """
+    kwargs = {key: value for key, value in kwargs.items() if key not in ignore}
+    payload = json.dumps([name, list(args), kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+class Cassette:
+    """A gzip-compressed JSON-lines file of recorded calls."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        # How many times each fingerprint has been replayed, so repeated calls
+        # get the recorded responses in their original order.
+        self._replay_counts = {}
+        if os.path.exists(path):
+            # Appended recordings are separate gzip members, which gzip reads as one stream
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def record(self, key, name, response, latency):
+        entry = {"key": key, "fn": name, "response": response, "latency": round(latency, 4)}
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def lookup(self, key):
+        """Returns the next recorded entry for a fingerprint, cycling when they run out."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded LLM call for fingerprint {key} in {self.path}")
+            index = self._replay_counts.get(key, 0)
+            self._replay_counts[key] = index + 1
+            return entries[index % len(entries)]
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def get_cassette():
+    """Returns the process-wide cassette named by MARVEL_LLM_CASSETTE."""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(os.environ.get("MARVEL_LLM_CASSETTE", DEFAULT_CASSETTE_PATH))
+        return _cassette
+
+def _replay_delay(entry):
+    latency_mode = os.environ.get("MARVEL_LLM_REPLAY_LATENCY", "recorded").lower()
+    if latency_mode not in LATENCY_MODES:
+        raise ValueError(f"Unknown LLM replay latency: {latency_mode}")
+    return 0.0 if latency_mode == "zero" else entry["latency"]
+
+def _lookup(key, on_miss):
+    """Returns (entry, None), or (None, fallback response) for a miss handled by `on_miss`."""
+    try:
+        return get_cassette().lookup(key), None
+    except CassetteMiss as e:
+        if on_miss is None:
+            raise
+        return None, on_miss(e)
+
+_random = None
+_random_lock = threading.Lock()
+
+def get_random():
+    """Returns the process-wide random generator, seeded by MARVEL_RANDOM_SEED if set."""
+    global _random
+    with _random_lock:
+        if _random is None:
+            seed = os.environ.get("MARVEL_RANDOM_SEED")
+            _random = random.Random(int(seed) if seed else None)
+        return _random
+
+def cassette(name, ignore=(), on_miss=None):
+    """Decorates a sync or async LLM call so it can be recorded and replayed.
+
+    `ignore` names keyword arguments left out of the fingerprint. `on_miss(error)`,
+    if given, supplies the response for a call missing from the cassette in replay
+    mode, the way the wrapped function reports an API failure, instead of raising
+    CassetteMiss.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                mode = cassette_mode()
+                if mode == "off":
+                    return await fn(*args, **kwargs)
+                key = fingerprint(name, args, kwargs, ignore)
+                if mode == "replay":
+                    entry, fallback = _lookup(key, on_miss)
+                    if entry is None:
+                        return fallback
+                    await asyncio.sleep(_replay_delay(entry))
+                    return entry["response"]
+                start = time.perf_counter()
+                response = await fn(*args, **kwargs)
+                get_cassette().record(key, name, response, time.perf_counter() - start)
+                return response
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = cassette_mode()
+            if mode == "off":
+                return fn(*args, **kwargs)
+            key = fingerprint(name, args, kwargs, ignore)
+            if mode == "replay":
+                entry, fallback = _lookup(key, on_miss)
+                if entry is None:
+                    return fallback
+                time.sleep(_replay_delay(entry))
+                return entry["response"]
+            start = time.perf_counter()
+            response = fn(*args, **kwargs)
+            get_cassette().record(key, name, response, time.perf_counter() - start)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,233 @@
+# Character data shared by both apps.
+# Kept in its own module so the roster is built once per process when it is first
+# imported, instead of on every Streamlit rerun of the entry scripts.
+
+# --- Marvel_guessing_game.py Roster ---
+# A dictionary of Marvel characters with hints and structured traits.
+# Traits are now in a dictionary for more reliable computer guessing.
+MARVEL_CHARACTERS = {
+    "Iron Man": {
+        "hints": [
+            "I am a genius, billionaire, playboy, philanthropist.",
+            "My suit is powered by an arc reactor.",
+            "I am the leader of the Avengers and often referred to as 'Tony'."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_human": True,
+            "is_genius": True,
+            "uses_special_weapon": True,
+            "has_healing_factor": False
+        }
+    },
+    "Captain America": {
+        "hints": [
+            "I am a super-soldier from World War II.",
+            "My primary weapon is a vibranium shield.",
+            "I was frozen in ice for decades before being revived."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_super_soldier": True,
+            "is_human": True,
+            "uses_special_weapon": True,
+            "has_healing_factor": False
+        }
+    },
+    "Hulk": {
+        "hints": [
+            "When I get angry, I transform into a giant green monster.",
+            "I am a brilliant scientist named Bruce Banner.",
+            "My catchphrase is 'Hulk Smash!'"
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_green": True,
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": True
+        }
+    },
+    "Thor": {
+        "hints": [
+            "I am a prince from Asgard, often called the God of Thunder.",
+            "My primary weapon is a powerful hammer, Mjolnir.",
+            "I have a brother named Loki."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_god": True,
+            "uses_special_weapon": True,
+            "has_healing_factor": False
+        }
+    },
+    "Black Widow": {
+        "hints": [
+            "I am a highly skilled spy and assassin.",
+            "I have a red-colored hair.",
+            "I am a founding member of the Avengers, but I don't have superpowers."
+        ],
+        "traits": {
+            "is_male": False,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": False
+        }
+    },
+    "Spider-Man": {
+        "hints": [
+            "My powers come from a radioactive spider bite.",
+            "I can shoot webs from my wrists.",
+            "My alter-ego is Peter Parker."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": False, # He is often an ally, but not always a core Avenger
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": True
+        }
+    },
+    "Black Panther": {
+        "hints": [
+            "I am the king and protector of the fictional African nation of Wakanda.",
+            "My suit is made of vibranium.",
+            "I have a sister named Shuri."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_king": True,
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": False
+        }
+    },
+    "Doctor Strange": {
+        "hints": [
+            "I am a Master of the Mystic Arts.",
+            "I was a brilliant surgeon before my accident.",
+            "My cloak has a life of its own."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_sorcerer": True,
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": False
+        }
+    },
+    "Ant-Man": {
+        "hints": [
+            "I can shrink to the size of an ant and also become a giant.",
+            "My suit is made by Dr. Hank Pym.",
+            "My alter-ego is Scott Lang."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_human": True,
+            "uses_special_weapon": False,
+            "has_healing_factor": False
+        }
+    },
+    "Captain Marvel": {
+        "hints": [
+            "I was a U.S. Air Force pilot.",
+            "I can fly and shoot energy blasts from my hands.",
+            "My real name is Carol Danvers."
+        ],
+        "traits": {
+            "is_male": False,
+            "is_hero": True,
+            "is_avenger": True,
+            "is_human": False, # Kree DNA
+            "uses_special_weapon": False,
+            "has_healing_factor": False
+        }
+    },
+    "Wolverine": {
+        "hints": [
+            "I have adamantium claws and an incredible healing factor.",
+            "I am part of the X-Men.",
+            "My real name is Logan."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": True,
+            "is_avenger": False,
+            "is_mutant": True,
+            "is_human": False,
+            "uses_special_weapon": True,
+            "has_healing_factor": True
+        }
+    },
+    "Deadpool": {
+        "hints": [
+            "I am a merc with a mouth and I know I'm in a comic book.",
+            "I have an incredible healing factor.",
+            "My alter-ego is Wade Wilson."
+        ],
+        "traits": {
+            "is_male": True,
+            "is_hero": False, # Anti-hero
+            "is_avenger": False,
+            "is_human": True,
+            "uses_special_weapon": True,
+            "has_healing_factor": True
+        }
+    }
+}
+
+# Questions for the computer to ask, mapped to the new traits
+COMPUTER_QUESTIONS = {
+    "is_male": "Is your character a male?",
+    "is_avenger": "Is your character an Avenger?",
+    "is_hero": "Is your character a hero?",
+    "uses_special_weapon": "Does your character use a special weapon?",
+    "has_healing_factor": "Does your character have a healing factor?",
+    "is_human": "Is your character human?",
+}
+
+# --- App.py Roster ---
+# Define a list of Marvel characters with their attributes for each difficulty level.
+# This serves as the "knowledge base" for the AI and the game logic.
+MARVEL_CHARACTERS_BY_DIFFICULTY = {
+    "Easy": [
+        {"name": "Spider-Man", "attributes": ["male", "human", "super-strength", "super-agility", "web-shooter", "new-york", "avenger", "hero"]},
+        {"name": "Iron Man", "attributes": ["male", "human", "genius", "powered-suit", "avenger", "hero", "billionaire", "weaponry"]},
+        {"name": "Captain America", "attributes": ["male", "human", "super-strength", "super-soldier", "avenger", "hero", "shield", "world-war-2"]},
+        {"name": "Hulk", "attributes": ["male", "human-like", "super-strength", "scientist", "monster", "avenger", "hero", "gamma-radiation"]},
+    ],
+    "Medium": [
+        {"name": "Thor", "attributes": ["male", "asgardian", "god", "super-strength", "hammer", "avenger", "hero", "lightning"]},
+        {"name": "Black Widow", "attributes": ["female", "human", "spy", "super-agility", "avenger", "hero", "agent", "russia"]},
+        {"name": "Doctor Strange", "attributes": ["male", "human", "magic", "sorcerer", "avenger", "hero", "doctor", "new-york"]},
+        {"name": "Black Panther", "attributes": ["male", "human", "super-strength", "king", "avenger", "hero", "wakanda", "vibranium"]},
+        {"name": "Loki", "attributes": ["male", "asgardian", "god", "magic", "villain", "trickster", "thor's-brother"]},
+        {"name": "Thanos", "attributes": ["male", "alien", "super-strength", "villain", "gauntlet", "infinity-stones"]},
+    ],
+    "Hard": [
+        {"name": "Scarlet Witch", "attributes": ["female", "mutant", "magic", "reality-warping", "avenger", "hero", "chaos-magic"]},
+        {"name": "Vision", "attributes": ["male", "robot", "super-strength", "avenger", "hero", "android", "mind-stone"]},
+        {"name": "Ant-Man", "attributes": ["male", "human", "shrinking", "ant-control", "avenger", "hero", "ex-con"]},
+        {"name": "The Wasp", "attributes": ["female", "human", "shrinking", "avenger", "hero", "wings", "stings"]},
+        {"name": "Winter Soldier", "attributes": ["male", "human", "super-strength", "assassin", "anti-hero", "metal-arm", "world-war-2"]},
+        {"name": "Nebula", "attributes": ["female", "cyborg", "villain", "avenger", "assassin", "thanos-daughter"]},
+    ]
+}
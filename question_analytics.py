@@ -0,0 +1,208 @@
+# Offline analytics over the game event log written by game_events.py.
+# Computes how well each question separates characters, which questions players ask
+# most, and where games are lost, then exports the results as a small JSON file that
+# both apps load at startup to order their questions.
+#
+# Usage: python question_analytics.py [--db marvel_events.db] [--out question_stats.json]
+
+import argparse
+import functools
+import json
+import math
+import sqlite3
+import time
+from collections import Counter, defaultdict
+
+from game_events import DEFAULT_EVENT_LOG_PATH, normalize_question
+
+DEFAULT_STATS_PATH = "question_stats.json"
+# Number of entries kept in each ranked table.
+TOP_N = 50
+# Modes where the player thinks of the character, so events can't name it and
+# the app can't tell whether its guess was right.
+PLAYER_PICKS_MODES = (("classic", "computer"), ("chat", "ai_guesses"))
+
+# --- Helpers ---
+
+def _answer_label(answer):
+    """Reduces a free-text answer such as "No. He is a god." to yes, no or other."""
+    words = normalize_question(answer or "").split()
+    if words and words[0] in ("yes", "no"):
+        return words[0]
+    return "other"
+
+def _entropy(counts):
+    """Entropy in bits of a Counter of observations."""
+    total = sum(counts.values())
+    return sum(c / total * math.log2(total / c) for c in counts.values() if c) if total else 0.0
+
+def discrimination(answers_by_character):
+    """Mutual information in bits between a question's answer and the secret character.
+
+    Takes {character: Counter(answer_label)}. When the character isn't known (e.g. the
+    player's own pick in AI Guesses mode) all answers fall under None, and the score
+    is simply how evenly the question splits the answers.
+    """
+    overall = Counter()
+    for counts in answers_by_character.values():
+        overall.update(counts)
+    total = sum(overall.values())
+    if not total:
+        return 0.0
+    known = {c: counts for c, counts in answers_by_character.items() if c is not None}
+    if not known:
+        return _entropy(overall)
+    conditional = sum(sum(counts.values()) / total * _entropy(counts) for counts in known.values())
+    return max(_entropy(overall) - conditional, 0.0)
+
+def _question_table(answers, question_games, game_outcomes):
+    """Builds per-question stats from {question: {character: Counter}}."""
+    table = {}
+    for question, by_character in answers.items():
+        overall = Counter()
+        for counts in by_character.values():
+            overall.update(counts)
+        asked = sum(overall.values())
+        outcomes = [game_outcomes[g] for g in question_games[question] if g in game_outcomes]
+        table[question] = {
+            "asked": asked,
+            "yes_rate": round(overall["yes"] / asked, 4),
+            "discrimination": round(discrimination(by_character), 4),
+            "win_rate": round(outcomes.count("win") / len(outcomes), 4) if outcomes else None,
+        }
+    return table
+
+def _ranked(table, key, limit=TOP_N):
+    """Turns a question table into a list sorted by the given field."""
+    rows = [{"question": q, **stats} for q, stats in table.items()]
+    rows.sort(key=lambda row: (row[key] or 0, row["asked"]), reverse=True)
+    return rows[:limit]
+
+# --- Analytics Job ---
+
+def compute_tables(connection):
+    """Computes the exported tables from an event log connection."""
+    rows = connection.execute(
+        "SELECT session, app, mode, kind, turn, character, question, answer, outcome "
+        "FROM game_events ORDER BY session, ts"
+    )
+
+    # {(app, mode): {question: {character: Counter(answer)}}}
+    answers = defaultdict(lambda: defaultdict(lambda: defaultdict(Counter)))
+    question_games = defaultdict(lambda: defaultdict(set))
+    game_outcomes = {}
+    mode_turns = defaultdict(lambda: {"win": [], "lose": []})
+    character_outcomes = defaultdict(Counter)
+    last_question_before_loss = Counter()
+
+    game_number = Counter()
+    last_question = {}
+    for session, app, mode, kind, turn, character, question, answer, outcome in rows:
+        game = (session, game_number[session])
+        player_picks = (app, mode) in PLAYER_PICKS_MODES
+        if player_picks:
+            # The player's own character is never known; older logs hold a random pick or the AI's guess
+            character = None
+        if kind == "question" and question:
+            # Computer mode questions are trait keys; free-text ones are normalized
+            label = question if app == "classic" and mode == "computer" else normalize_question(question)
+            answers[(app, mode)][label][character][_answer_label(answer)] += 1
+            question_games[(app, mode)][label].add(game)
+            last_question[session] = label
+        elif player_picks and kind in ("guess", "outcome"):
+            # The app's guess (or an outcome judged against an unrelated pick in older
+            # logs) ends the game without a known result
+            game_number[session] += 1
+            last_question.pop(session, None)
+        elif kind == "outcome" and outcome in ("win", "lose"):
+            game_outcomes[game] = outcome
+            mode_turns[(app, mode)][outcome].append(turn or 0)
+            if character:
+                character_outcomes[character][outcome] += 1
+            if outcome == "lose" and session in last_question:
+                last_question_before_loss[last_question[session]] += 1
+            game_number[session] += 1
+            last_question.pop(session, None)
+
+    tables = {
+        "generated_at": time.time(),
+        "games": len(game_outcomes),
+        "computer_questions": _question_table(
+            answers[("classic", "computer")], question_games[("classic", "computer")], game_outcomes
+        ),
+    }
+
+    user_questions, user_games, ai_questions, ai_games = {}, defaultdict(set), {}, defaultdict(set)
+    for (app, mode), by_question in answers.items():
+        if (app, mode) == ("classic", "computer"):
+            continue
+        target, games = (ai_questions, ai_games) if mode == "ai_guesses" else (user_questions, user_games)
+        for question, by_character in by_question.items():
+            merged = target.setdefault(question, defaultdict(Counter))
+            for character, counts in by_character.items():
+                merged[character].update(counts)
+            games[question].update(question_games[(app, mode)][question])
+    tables["user_questions"] = _ranked(_question_table(user_questions, user_games, game_outcomes), "asked")
+    tables["ai_questions"] = _ranked(_question_table(ai_questions, ai_games, game_outcomes), "discrimination")
+
+    by_mode = {}
+    for (app, mode), turns in mode_turns.items():
+        games = len(turns["win"]) + len(turns["lose"])
+        by_mode[f"{app}/{mode}"] = {
+            "games": games,
+            "win_rate": round(len(turns["win"]) / games, 4),
+            "avg_turns_to_win": round(sum(turns["win"]) / len(turns["win"]), 2) if turns["win"] else None,
+            "avg_turns_to_lose": round(sum(turns["lose"]) / len(turns["lose"]), 2) if turns["lose"] else None,
+        }
+    hardest = [
+        {"character": c, "games": sum(o.values()), "win_rate": round(o["win"] / sum(o.values()), 4)}
+        for c, o in character_outcomes.items()
+    ]
+    hardest.sort(key=lambda row: (row["win_rate"], -row["games"]))
+    tables["failure_points"] = {
+        "by_mode": by_mode,
+        "hardest_characters": hardest[:TOP_N],
+        "last_question_before_loss": [
+            {"question": q, "count": n} for q, n in last_question_before_loss.most_common(TOP_N)
+        ],
+    }
+    return tables
+
+def export_tables(db_path=DEFAULT_EVENT_LOG_PATH, out_path=DEFAULT_STATS_PATH):
+    """Runs the analytics job and writes the tables to a JSON file."""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = compute_tables(connection)
+    finally:
+        connection.close()
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(tables, f, indent=1)
+    return tables
+
+# --- Loading at Startup ---
+
+@functools.lru_cache(maxsize=None)
+def load_question_stats(path=DEFAULT_STATS_PATH):
+    """Loads the exported tables once per process, or empty tables if there are none yet."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"games": 0, "computer_questions": {}, "user_questions": [], "ai_questions": [], "failure_points": {}}
+
+def question_priority(stats, question_keys):
+    """Returns the historical discrimination of each computer question, in order."""
+    table = stats.get("computer_questions", {})
+    return [table.get(key, {}).get("discrimination", 0.0) for key in question_keys]
+
+def top_questions(stats, table, limit=5):
+    """Returns the question texts at the top of a ranked table."""
+    return [row["question"] for row in stats.get(table, [])[:limit]]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute question analytics from the game event log.")
+    parser.add_argument("--db", default=DEFAULT_EVENT_LOG_PATH, help="event log database")
+    parser.add_argument("--out", default=DEFAULT_STATS_PATH, help="where to write the exported tables")
+    args = parser.parse_args()
+    tables = export_tables(args.db, args.out)
+    print(f"Analyzed {tables['games']} games, wrote {args.out}")
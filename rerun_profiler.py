@@ -0,0 +1,211 @@
+# Opt-in profiler for individual Streamlit script runs.
+# Turn it on with MARVEL_PROFILE=1, or by adding ?profile=1 to the URL when the operator
+# has also set MARVEL_PROFILE_ALLOW_QUERY=1 (profiles are written to disk and the
+# summary shows every session's timings, so visitors can't switch it on). Each run is
+# sampled from a background thread (wall-clock, so sleeps and LLM waits show up too),
+# tagged with the widget that triggered it, and written as a collapsed-stack file
+# that flamegraph.pl or speedscope can open. Only the newest files are kept.
+#
+# Usage: python rerun_profiler.py [profiles]   (ranks the most expensive rerun paths)
+
+import argparse
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+PROFILE_DIR = os.environ.get("MARVEL_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("MARVEL_PROFILE_INTERVAL_MS", "5")) / 1000
+# Oldest profiles are deleted once there are more than this many.
+MAX_PROFILE_FILES = 200
+SNAPSHOT_KEY = "_profiler_widget_snapshot"
+FILE_PATTERN = re.compile(r"^(?P<ts>\d+)-(?P<script>[^-]+)-(?P<tag>.+)-(?P<ms>\d+)ms\.folded$")
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+def profiling_enabled(query_params):
+    """Checks MARVEL_PROFILE, and the ?profile= query parameter if the operator allows it."""
+    if _env_flag("MARVEL_PROFILE"):
+        return True
+    if not _env_flag("MARVEL_PROFILE_ALLOW_QUERY"):
+        return False
+    return query_params.get("profile", "").lower() in ("1", "true", "yes")
+
+# --- Trigger Detection ---
+
+# The snapshot is taken when a run ends, after the script's own state changes, so the
+# next run's diff only holds what changed between runs: the widget the user touched,
+# and buttons and other triggers that were True for the previous run falling back to False.
+
+def _widget_snapshot(session_state):
+    """Returns the scalar values in session state, which include every keyed widget."""
+    return {
+        key: value
+        for key, value in session_state.items()
+        if key != SNAPSHOT_KEY and isinstance(value, (bool, int, float, str, type(None)))
+    }
+
+def save_snapshot(session_state):
+    """Records the state at the end of a run for the next run's detect_trigger()."""
+    session_state[SNAPSHOT_KEY] = _widget_snapshot(session_state)
+
+def detect_trigger(session_state):
+    """Names the widget that triggered this run, based on what changed since the last run ended."""
+    previous = session_state.get(SNAPSHOT_KEY)
+    if previous is None:
+        return "initial"
+    snapshot = _widget_snapshot(session_state)
+    changed = {key: value for key, value in snapshot.items() if key in previous and previous[key] != value}
+    # A clicked button (or a ticked checkbox) turned True
+    pressed = sorted(key for key, value in changed.items() if value is True)
+    edited = sorted(key for key, value in changed.items() if value is not True and previous[key] is not True)
+    # Alone, a True -> False change is an unticked checkbox rather than a button resetting
+    released = sorted(key for key, value in changed.items() if value is False and previous[key] is True)
+    for keys in (pressed, edited, released):
+        if keys:
+            return keys[0]
+    return "rerun"
+
+# --- Sampling ---
+
+class RerunProfiler:
+    """Samples one script run's stack until the script's frames leave the thread."""
+
+    def __init__(self, script_path, tag, session_state=None, interval=SAMPLE_INTERVAL_SECONDS, profile_dir=PROFILE_DIR):
+        self.script_path = os.path.abspath(script_path)
+        self.session_state = session_state
+        self.tag = re.sub(r"[^A-Za-z0-9_.]+", "_", tag)
+        self.interval = interval
+        self.profile_dir = profile_dir
+        self.stacks = collections.Counter()
+        self._target = threading.get_ident()
+        self._stopped = threading.Event()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="rerun-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Ends the run: saves the trigger snapshot, stops sampling and waits for the profile.
+
+        Call it however the script ends, including st.rerun(), so the next run's trigger
+        is detected against this run's final state.
+        """
+        if self.session_state is not None:
+            save_snapshot(self.session_state)
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def _script_stack(self, frame):
+        """Returns the stack from the script's module frame down, or None if it has finished."""
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            code = frame.f_code
+            if code.co_name == "<module>" and os.path.abspath(code.co_filename) == self.script_path:
+                return [
+                    f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)}:{f.f_lineno})"
+                    for f in reversed(frames)
+                ]
+            frame = frame.f_back
+        return None
+
+    def _sample_loop(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = self._script_stack(frame) if frame is not None else None
+            if stack is None:
+                # The run ended normally or was interrupted by st.rerun()
+                break
+            self.stacks[";".join(stack)] += 1
+        self._write()
+
+    def _write(self):
+        """Writes the collapsed stacks and trims old profiles."""
+        duration_ms = int((time.perf_counter() - self._started_at) * 1000)
+        if not self.stacks:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        script = os.path.splitext(os.path.basename(self.script_path))[0].replace("-", "_")
+        path = os.path.join(self.profile_dir, f"{int(time.time() * 1000)}-{script}-{self.tag}-{duration_ms}ms.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        profiles = sorted(name for name in os.listdir(self.profile_dir) if FILE_PATTERN.match(name))
+        for name in profiles[:-MAX_PROFILE_FILES]:
+            try:
+                os.remove(os.path.join(self.profile_dir, name))
+            except OSError:
+                pass
+
+def start_rerun_profile(session_state, query_params, script_path):
+    """Starts profiling this script run if profiling is enabled. Returns the profiler or None."""
+    if not profiling_enabled(query_params):
+        return None
+    return RerunProfiler(script_path, detect_trigger(session_state), session_state).start()
+
+# --- Summary ---
+
+def summarize(profile_dir=PROFILE_DIR, top_frames=3):
+    """Ranks rerun paths (script and trigger) by total time spent in them."""
+    runs = collections.defaultdict(list)
+    leaves = collections.defaultdict(collections.Counter)
+    if not os.path.isdir(profile_dir):
+        return []
+    for name in os.listdir(profile_dir):
+        match = FILE_PATTERN.match(name)
+        if not match:
+            continue
+        path_key = (match["script"], match["tag"])
+        runs[path_key].append(int(match["ms"]))
+        with open(os.path.join(profile_dir, name), encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                leaves[path_key][stack.split(";")[-1]] += int(count)
+
+    summary = []
+    for (script, tag), durations in runs.items():
+        durations.sort()
+        summary.append({
+            "script": script,
+            "trigger": tag,
+            "runs": len(durations),
+            "total_ms": sum(durations),
+            "mean_ms": round(sum(durations) / len(durations), 1),
+            "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+            "hottest_frames": [frame for frame, _ in leaves[(script, tag)].most_common(top_frames)],
+        })
+    summary.sort(key=lambda row: row["total_ms"], reverse=True)
+    return summary
+
+def render_summary(profile_dir=PROFILE_DIR):
+    """Shows the ranked rerun paths in the Streamlit sidebar."""
+    import streamlit as st
+
+    with st.sidebar.expander("Rerun profile"):
+        summary = summarize(profile_dir)
+        if not summary:
+            st.write("No profiled runs yet.")
+        for row in summary[:10]:
+            st.markdown(
+                f"**{row['script']} / {row['trigger']}** - {row['runs']} runs, "
+                f"mean {row['mean_ms']} ms, p95 {row['p95_ms']} ms"
+            )
+            for frame in row["hottest_frames"]:
+                st.caption(frame)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank the most expensive Streamlit rerun paths.")
+    parser.add_argument("profile_dir", nargs="?", default=PROFILE_DIR)
+    args = parser.parse_args()
+
+    print(f"{'script / trigger':<48} {'runs':>5} {'total ms':>9} {'mean ms':>8} {'p95 ms':>7}")
+    for row in summarize(args.profile_dir):
+        print(f"{row['script'] + ' / ' + row['trigger']:<48} {row['runs']:>5} {row['total_ms']:>9} {row['mean_ms']:>8} {row['p95_ms']:>7}")
+        for frame in row["hottest_frames"]:
+            print(f"    {frame}")
@@ -0,0 +1,399 @@
+# Analyzes a character roster to find characters the questions can't tell apart.
+# Works on the trait matrix (1 = True, 0 = False, -1 = unknown) with vectorized NumPy
+# ops, so it handles rosters of 100k characters in seconds. As in the game, an unknown
+# trait fits either answer. It reports groups of characters the same answers fit, how
+# many questions each character needs, a difficulty derived from those numbers, and
+# which traits are worth turning into questions.
+#
+# Usage: python roster_analyzer.py [--roster roster.json | --app-roster] [--synthetic N]
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bayesian_guesser import build_trait_matrix
+
+# Above this many characters the full pairwise distance matrix isn't built.
+PAIRWISE_LIMIT = 2000
+# Limits for the exact nearest-distance transform over all answer sequences.
+HYPERCUBE_MAX_QUESTIONS = 22
+MAX_COMPLETIONS = 1 << 22
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+# --- Trait Matrices ---
+
+def attribute_matrix(characters):
+    """Builds a 0/1 matrix from App.py-style [{"name", "attributes"}] entries."""
+    vocabulary = sorted({attr for c in characters for attr in c["attributes"]})
+    column = {attr: i for i, attr in enumerate(vocabulary)}
+    matrix = np.zeros((len(characters), len(vocabulary)), dtype=np.int8)
+    for row, c in enumerate(characters):
+        matrix[row, [column[attr] for attr in c["attributes"]]] = 1
+    return matrix, vocabulary
+
+# --- Distances ---
+#
+# A player can only answer Yes or No, so an unknown trait (-1) fits either answer.
+# Two characters differ on a question only when both values are known and different.
+
+def pairwise_distances(matrix):
+    """Returns the matrix of how many questions separate each pair of characters.
+
+    Counts the traits known for both characters with different values, as two
+    matrix products over the yes and no indicators.
+    """
+    yes = (matrix == 1).astype(np.float32)
+    no = (matrix == 0).astype(np.float32)
+    return (yes @ no.T + no @ yes.T).astype(np.int32)
+
+def _blocked_nearest(matrix, block_size=PAIRWISE_LIMIT):
+    """Exact nearest distances without holding the full pairwise matrix."""
+    yes = (matrix == 1).astype(np.float32)
+    no = (matrix == 0).astype(np.float32)
+    nearest = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), block_size):
+        stop = min(start + block_size, len(matrix))
+        distances = yes[start:stop] @ no.T + no[start:stop] @ yes.T
+        distances[np.arange(stop - start), np.arange(start, stop)] = matrix.shape[1] + 1
+        nearest[start:stop] = distances.min(axis=1)
+    return nearest
+
+def _completions(matrix):
+    """Expands each character into every Yes/No answer sequence that fits it.
+
+    Returns (cells, owners): each sequence as a bitmask and the character it belongs to.
+    """
+    num_questions = matrix.shape[1]
+    powers = np.int64(1) << np.arange(num_questions, dtype=np.int64)
+    base = (matrix == 1).astype(np.int64) @ powers
+    unknown = matrix < 0
+    unknown_counts = unknown.sum(axis=1)
+    cells, owners = [], []
+    for k in np.unique(unknown_counts):
+        rows = np.flatnonzero(unknown_counts == k)
+        if k == 0:
+            cells.append(base[rows])
+            owners.append(rows)
+            continue
+        # np.nonzero walks row by row, so each row's unknown columns are contiguous
+        unknown_bits = powers[np.nonzero(unknown[rows])[1].reshape(len(rows), k)]
+        choices = (np.arange(2 ** k, dtype=np.int64)[:, None] >> np.arange(k)) & 1
+        cells.append((base[rows] + choices @ unknown_bits.T).ravel())
+        owners.append(np.tile(rows, 2 ** k))
+    return np.concatenate(cells), np.concatenate(owners)
+
+def _hypercube_nearest(matrix, cells, owners):
+    """Exact nearest distances via a distance transform over every answer sequence.
+
+    Each cell of the 2^questions cube keeps its two closest distinct characters.
+    One pass per question relaxes cells against the cell with that answer flipped.
+    """
+    num_questions = matrix.shape[1]
+    size = 1 << num_questions
+    far = num_questions + 1
+    order = np.lexsort((owners, cells))
+    cells, owners = cells[order], owners[order]
+    first = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+    second = first + 1
+    second = second[(second < len(cells)) & (cells[np.minimum(second, len(cells) - 1)] == cells[first])]
+
+    best_d = np.full(size, far, dtype=np.int32)
+    best_o = np.full(size, -1, dtype=np.int64)
+    next_d = np.full(size, far, dtype=np.int32)
+    next_o = np.full(size, -1, dtype=np.int64)
+    best_d[cells[first]], best_o[cells[first]] = 0, owners[first]
+    next_d[cells[second]], next_o[cells[second]] = 0, owners[second]
+
+    index = np.arange(size, dtype=np.int64)
+    rows = np.arange(size)
+    for bit in range(num_questions):
+        flipped = index ^ (1 << bit)
+        candidate_d = np.stack([
+            best_d, next_d,
+            np.minimum(best_d[flipped] + 1, far), np.minimum(next_d[flipped] + 1, far),
+        ], axis=1)
+        candidate_o = np.stack([best_o, next_o, best_o[flipped], next_o[flipped]], axis=1)
+        closest = candidate_d.argmin(axis=1)
+        best_d, best_o = candidate_d[rows, closest], candidate_o[rows, closest]
+        others = np.where(candidate_o != best_o[:, None], candidate_d, far)
+        runner_up = others.argmin(axis=1)
+        next_d, next_o = others[rows, runner_up], candidate_o[rows, runner_up]
+
+    distances = np.where(best_o[cells] != owners, best_d[cells], next_d[cells])
+    nearest = np.full(len(matrix), far, dtype=np.int32)
+    np.minimum.at(nearest, owners, distances)
+    return nearest
+
+def nearest_distances(matrix):
+    """Returns how many questions separate each character from its closest other character.
+
+    Always exact. Small rosters use the full pairwise matrix. Larger ones use a
+    distance transform over all 2^questions answer sequences when that is small
+    enough, and otherwise compare characters block by block.
+    """
+    if len(matrix) <= PAIRWISE_LIMIT:
+        distances = pairwise_distances(matrix)
+        np.fill_diagonal(distances, matrix.shape[1] + 1)
+        return distances.min(axis=1)
+    if matrix.shape[1] <= HYPERCUBE_MAX_QUESTIONS:
+        num_completions = int((2 ** (matrix < 0).sum(axis=1)).sum())
+        if num_completions <= MAX_COMPLETIONS:
+            return _hypercube_nearest(matrix, *_completions(matrix))
+    return _blocked_nearest(matrix)
+
+# --- Questions Needed and Indistinguishable Groups ---
+
+def _split_tree(matrix):
+    """Plays the greedy question strategy against every character at once.
+
+    Always asks the question whose larger answer branch is smallest. A character with
+    an unknown trait follows both branches, since the player could answer either way.
+    The tree is grown one level at a time over all open nodes.
+
+    Returns (depth, members, group_ids): the worst-case number of questions to single
+    out each character (-1 if some answers never do), and the groups of characters that
+    end up sharing a node no question can split, as flat member and group id arrays.
+    """
+    num_characters, num_questions = matrix.shape
+    values = matrix.astype(np.int64) + 1  # 0 unknown, 1 no, 2 yes
+    depth = np.zeros(num_characters, dtype=np.int32)
+    unresolved = np.zeros(num_characters, dtype=bool)
+    stuck_keys, stuck_members = [], []
+    # Random per-character values whose sums identify a group without comparing members
+    group_hash = np.random.default_rng(0).integers(0, np.iinfo(np.int64).max, num_characters, dtype=np.uint64)
+
+    owner = np.arange(num_characters)
+    node = np.zeros(num_characters, dtype=np.int64)
+    for level in range(num_questions + 1):
+        if len(owner) == 0:
+            break
+        # Node ids are dense (parent * 2 + answer), so bincount replaces np.unique
+        single = np.bincount(node)[node] == 1
+        np.maximum.at(depth, owner[single], level)
+        owner, node = owner[~single], node[~single]
+        if len(owner) == 0:
+            break
+        node_sizes = np.bincount(node)
+        local_id = np.cumsum(node_sizes > 0) - 1
+        local_node, node_sizes = local_id[node], node_sizes[node_sizes > 0]
+        num_nodes = len(node_sizes)
+
+        if level < num_questions:
+            # counts[n, q, v]: characters in node n with value v for question q
+            flat = (local_node[:, None] * num_questions + np.arange(num_questions)) * 3 + values[owner]
+            counts = np.bincount(flat.ravel(), minlength=num_nodes * num_questions * 3)
+            counts = counts.reshape(num_nodes, num_questions, 3)
+            larger_branch = np.maximum(counts[:, :, 1], counts[:, :, 2]) + counts[:, :, 0]
+            # Among equally balanced questions, prefer the one with fewer unknowns
+            best_question = (larger_branch * (num_characters + 1) + counts[:, :, 0]).argmin(axis=1)
+            stuck = larger_branch.min(axis=1) >= node_sizes
+        else:
+            stuck = np.ones(num_nodes, dtype=bool)
+
+        stuck_rows = stuck[local_node]
+        if stuck_rows.any():
+            unresolved[owner[stuck_rows]] = True
+            stuck_owner, stuck_node = owner[stuck_rows], local_node[stuck_rows]
+            keys = np.zeros(num_nodes, dtype=np.uint64)
+            np.add.at(keys, stuck_node, group_hash[stuck_owner])
+            stuck_keys.append(keys[stuck_node])
+            stuck_members.append(stuck_owner)
+            owner, local_node = owner[~stuck_rows], local_node[~stuck_rows]
+        if len(owner) == 0:
+            break
+
+        answer = values[owner, best_question[local_node]]
+        # Unknowns are copied into both the yes and the no branch
+        both = answer == 0
+        owner = np.concatenate([owner, owner[both]])
+        node = np.concatenate([local_node * 2 + (answer == 2), local_node[both] * 2 + 1])
+
+    depth[unresolved] = -1
+    if not stuck_members:
+        return depth, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    # The same group can get stuck in several branches; keep one copy of each
+    pairs = np.unique(np.stack([np.concatenate(stuck_keys), np.concatenate(stuck_members).astype(np.uint64)]), axis=1)
+    _, group_ids = np.unique(pairs[0], return_inverse=True)
+    return depth, pairs[1].astype(np.int64), group_ids.ravel()
+
+def _group_lists(names, members, group_ids):
+    """Turns flat group arrays into lists of names, ordered by their first member."""
+    if len(members) == 0:
+        return []
+    groups = np.split(members, np.flatnonzero(np.diff(group_ids)) + 1)
+    groups.sort(key=lambda group: group[0])
+    return [[names[i] for i in group] for group in groups]
+
+def questions_needed(matrix):
+    """Returns how many questions it takes to single out each character.
+
+    Simulates a greedy strategy (an upper bound on the true minimum) and takes the
+    worst case over the answers a player could give. Characters that can't always be
+    singled out get -1.
+    """
+    return _split_tree(matrix)[0]
+
+def indistinguishable_groups(names, matrix):
+    """Returns groups of character names that the same Yes/No answers fit throughout."""
+    return _group_lists(names, *_split_tree(matrix)[1:])
+
+def derive_difficulty(needed, nearest):
+    """Buckets characters into Easy/Medium/Hard thirds.
+
+    Characters are ranked by questions needed, then by how close their nearest
+    look-alike is. Characters that can't be singled out are always Hard.
+    """
+    difficulty = np.full(len(needed), DIFFICULTIES[-1], dtype=object)
+    resolvable = np.flatnonzero(needed >= 0)
+    ranked = resolvable[np.lexsort((-nearest[resolvable], needed[resolvable]))]
+    for bucket, members in enumerate(np.array_split(ranked, len(DIFFICULTIES))):
+        difficulty[members] = DIFFICULTIES[bucket]
+    return difficulty
+
+def suggest_questions(matrix, askable, trait_names, limit=5):
+    """Suggests traits to promote into askable questions.
+
+    Greedily picks the trait that lets the most characters be singled out given the
+    currently askable columns, then repeats with it added. Optional traits are only
+    listed for the characters that have them (e.g. is_god), so a missing value counts
+    as False for a candidate trait; askable columns keep the unknown-fits-either rule.
+    Returns (trait_name, characters_separated) pairs.
+    """
+    askable = list(askable)
+    candidates = [col for col in range(matrix.shape[1]) if col not in askable]
+    matrix = matrix.copy()
+    matrix[:, candidates] = np.maximum(matrix[:, candidates], 0)
+    suggestions = []
+    for _ in range(limit):
+        _, members, group_ids = _split_tree(matrix[:, askable])
+        if len(members) == 0:
+            break
+        # Every pair of characters the answers can't separate shares at least one group
+        group_sizes = np.bincount(group_ids)
+        num_groups = len(group_sizes)
+        unresolved_before = len(np.unique(members))
+        best_trait, best_separated = None, 0
+        for col in range(matrix.shape[1]):
+            if col in askable:
+                continue
+            value = matrix[members, col]
+            yes = np.bincount(group_ids, weights=value == 1, minlength=num_groups)[group_ids]
+            no = np.bincount(group_ids, weights=value == 0, minlength=num_groups)[group_ids]
+            unknown = group_sizes[group_ids] - yes - no
+            # Another group member still fits the same answer to this trait
+            look_alike = np.where(value == 1, yes - 1 + unknown, np.where(value == 0, no - 1 + unknown, group_sizes[group_ids] - 1)) > 0
+            separated = unresolved_before - len(np.unique(members[look_alike]))
+            if separated > best_separated:
+                best_trait, best_separated = col, separated
+        if best_trait is None:
+            break
+        askable.append(best_trait)
+        suggestions.append((trait_names[best_trait], best_separated))
+    return suggestions
+
+# --- Report ---
+
+def analyze(names, matrix, askable, trait_names, assigned_difficulty=None):
+    """Runs every analysis and returns the results as a dictionary."""
+    askable_matrix = matrix[:, askable]
+    needed, members, group_ids = _split_tree(askable_matrix)
+    nearest = nearest_distances(askable_matrix)
+    report = {
+        "characters": len(names),
+        "askable_questions": [trait_names[i] for i in askable],
+        "indistinguishable_groups": _group_lists(names, members, group_ids),
+        "nearest_distance": dict(zip(names, nearest.tolist())),
+        "questions_needed": dict(zip(names, needed.tolist())),
+        "difficulty": dict(zip(names, derive_difficulty(needed, nearest).tolist())),
+        "suggested_questions": suggest_questions(matrix, askable, trait_names),
+    }
+    if assigned_difficulty:
+        report["difficulty_changes"] = {
+            name: (assigned_difficulty[name], report["difficulty"][name])
+            for name in names
+            if assigned_difficulty.get(name) != report["difficulty"][name]
+        }
+    return report
+
+def load_roster(path=None, app_roster=False):
+    """Loads a roster as (names, matrix, askable_columns, trait_names, assigned_difficulty).
+
+    Without a path the roster and questions from Marvel_guessing_game.py are used, or
+    App.py's roster with `app_roster`. A JSON file may hold either {name: {"traits": {...}}}
+    or App.py's {difficulty: [{"name", "attributes"}]} layout; in the latter every
+    attribute counts as askable.
+    """
+    if path is None:
+        import marvel_roster
+        if app_roster:
+            characters = marvel_roster.MARVEL_CHARACTERS_BY_DIFFICULTY
+        else:
+            characters = marvel_roster.MARVEL_CHARACTERS
+        question_keys = list(marvel_roster.COMPUTER_QUESTIONS.keys())
+    else:
+        with open(path, encoding="utf-8") as f:
+            characters = json.load(f)
+        question_keys = None
+
+    first = next(iter(characters.values()))
+    if isinstance(first, list):
+        entries = [c for level in characters.values() for c in level]
+        matrix, trait_names = attribute_matrix(entries)
+        assigned = {c["name"]: level for level, group in characters.items() for c in group}
+        return [c["name"] for c in entries], matrix, list(range(len(trait_names))), trait_names, assigned
+
+    trait_names = sorted({key for c in characters.values() for key in c["traits"]})
+    if question_keys:
+        trait_names = question_keys + [t for t in trait_names if t not in question_keys]
+    matrix = build_trait_matrix(characters, trait_names)
+    askable = list(range(len(question_keys))) if question_keys else list(range(len(trait_names)))
+    return list(characters.keys()), matrix, askable, trait_names, None
+
+def synthetic_roster(num_characters, num_traits=24, num_askable=16, seed=0):
+    """Builds a random roster for benchmarking large-scale analysis."""
+    rng = np.random.default_rng(seed)
+    matrix = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=(num_characters, num_traits), p=[0.1, 0.45, 0.45])
+    names = [f"Character {i}" for i in range(num_characters)]
+    trait_names = [f"trait_{j}" for j in range(num_traits)]
+    return names, matrix, list(range(num_askable)), trait_names, None
+
+def print_report(report, max_rows=20):
+    """Prints a human-readable summary of an analysis."""
+    print(f"Characters: {report['characters']}")
+    print(f"Askable questions: {', '.join(report['askable_questions'])}")
+    groups = report["indistinguishable_groups"]
+    print(f"\nIndistinguishable groups ({len(groups)}):")
+    for group in groups[:max_rows]:
+        print(f"  - {', '.join(group[:10])}{' ...' if len(group) > 10 else ''}")
+    print("\nQuestions needed / nearest distance / difficulty:")
+    for name in list(report["questions_needed"])[:max_rows]:
+        needed = report["questions_needed"][name]
+        print(f"  {name:<24} {needed if needed >= 0 else 'never':>5}  {report['nearest_distance'][name]:>3}  {report['difficulty'][name]}")
+    if report.get("difficulty_changes"):
+        print("\nDifficulty changes (assigned -> derived):")
+        for name, (assigned, derived) in list(report["difficulty_changes"].items())[:max_rows]:
+            print(f"  {name:<24} {assigned} -> {derived}")
+    print("\nSuggested questions (trait, characters separated):")
+    for trait, separated in report["suggested_questions"]:
+        print(f"  {trait:<24} {separated}")
+    if not report["suggested_questions"]:
+        if groups:
+            print("  None of the remaining traits separates the groups above; the roster needs new traits.")
+        else:
+            print("  None needed, every character can be singled out.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find characters the game's questions can't tell apart.")
+    parser.add_argument("--roster", help="JSON roster file (defaults to Marvel_guessing_game.py)")
+    parser.add_argument("--app-roster", action="store_true", help="analyze App.py's difficulty-bucketed roster")
+    parser.add_argument("--synthetic", type=int, help="analyze a random roster of this many characters instead")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    roster = synthetic_roster(args.synthetic) if args.synthetic else load_roster(args.roster, args.app_roster)
+    report = analyze(*roster)
+    elapsed = time.perf_counter() - start
+    print_report(report)
+    print(f"\nAnalyzed {report['characters']} characters in {elapsed:.2f}s")
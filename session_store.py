@@ -0,0 +1,281 @@
+# Pluggable storage for game state so a game isn't tied to one Streamlit process.
+# The game state is serialized to compact JSON, compressed, and stored under a token
+# that is kept in the page URL. Any replica that shares the store can pick the game
+# up again from that token, e.g. after a restart or when a load balancer moves the user.
+#
+# Backends are selected with the MARVEL_SESSION_STORE environment variable:
+#   memory (default) - per-process dictionary, useful for a single replica
+#   sqlite           - SQLite database in WAL mode at MARVEL_SESSION_DB
+# Games nobody has saved for MARVEL_SESSION_TTL_HOURS (default one week) expire.
+
+import atexit
+import collections
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+
+TOKEN_QUERY_PARAM = "game"
+DEFAULT_SQLITE_PATH = "marvel_sessions.db"
+# Pending writes are flushed when this many games are waiting or this many seconds pass.
+FLUSH_BATCH_SIZE = 64
+FLUSH_INTERVAL_SECONDS = 0.5
+# Games not saved for this long are treated as abandoned and removed.
+SESSION_TTL_SECONDS = float(os.environ.get("MARVEL_SESSION_TTL_HOURS", "168")) * 60 * 60
+PRUNE_INTERVAL_SECONDS = 10 * 60
+# Tokens whose last written state is remembered, to skip unchanged saves.
+WRITTEN_HASH_LIMIT = 10000
+
+# --- Serialization ---
+
+# JSON has no tuples; they are stored as {TUPLE_TAG: [...]} so e.g. the
+# (question, answer) pairs in a question history come back as tuples.
+TUPLE_TAG = "__tuple__"
+
+def _tag_tuples(value):
+    if isinstance(value, tuple):
+        return {TUPLE_TAG: [_tag_tuples(item) for item in value]}
+    if isinstance(value, list):
+        return [_tag_tuples(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _tag_tuples(item) for key, item in value.items()}
+    return value
+
+def _untag_tuples(obj):
+    return tuple(obj[TUPLE_TAG]) if len(obj) == 1 and TUPLE_TAG in obj else obj
+
+def encode_state(state):
+    """Serializes a game state dictionary to compressed JSON bytes."""
+    return zlib.compress(json.dumps(_tag_tuples(state), separators=(",", ":")).encode("utf-8"))
+
+def decode_state(blob):
+    """Restores a game state dictionary from compressed JSON bytes."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"), object_hook=_untag_tuples)
+
+def new_token():
+    """Creates a new, unguessable game token."""
+    return secrets.token_urlsafe(16)
+
+def _blob_hash(blob):
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+# --- Backends ---
+
+class MemorySessionStore:
+    """Keeps encoded game states in a dictionary shared by the whole process."""
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._states = {}
+        self._lock = threading.Lock()
+        self._last_pruned = time.time()
+
+    def load(self, token):
+        entry = self._states.get(token)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return decode_state(entry[0])
+
+    def save(self, token, state):
+        now = time.time()
+        self._states[token] = (encode_state(state), now)
+        if now - self._last_pruned > PRUNE_INTERVAL_SECONDS:
+            self.prune(now)
+
+    def prune(self, now=None):
+        """Removes games that haven't been saved within the TTL."""
+        now = now or time.time()
+        with self._lock:
+            self._last_pruned = now
+            for token in [token for token, (_, updated_at) in list(self._states.items()) if now - updated_at > self.ttl]:
+                self._states.pop(token, None)
+
+    def delete(self, token):
+        self._states.pop(token, None)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class SQLiteSessionStore:
+    """Stores encoded game states in SQLite with write-behind batching.
+
+    Saves are queued in memory (only the latest state per token is kept) and a
+    background thread writes them in a single transaction, so a script run never
+    waits on disk. The same thread periodically deletes games older than the TTL.
+    """
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, batch_size=FLUSH_BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 ttl=SESSION_TTL_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self._pending = {}
+        # Hash of the last written state per token, least recently written first
+        self._written_hashes = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS game_sessions ("
+            "token TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS game_sessions_updated_at ON game_sessions (updated_at)")
+        connection.commit()
+
+        self._writer = threading.Thread(target=self._write_behind, name="session-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connection(self):
+        """Returns this thread's connection to the database."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def load(self, token):
+        with self._lock:
+            blob = self._pending.get(token)
+        if blob is None:
+            row = self._connection().execute(
+                "SELECT state FROM game_sessions WHERE token = ? AND updated_at >= ?", (token, time.time() - self.ttl)
+            ).fetchone()
+            blob = row[0] if row else None
+        return decode_state(blob) if blob is not None else None
+
+    def save(self, token, state):
+        blob = encode_state(state)
+        with self._lock:
+            # Skip reruns that didn't change the game
+            pending = self._pending.get(token)
+            if pending == blob or (pending is None and self._written_hashes.get(token) == _blob_hash(blob)):
+                return
+            self._pending[token] = blob
+            pending_count = len(self._pending)
+        if pending_count >= self.batch_size:
+            self._wake.set()
+
+    def delete(self, token):
+        with self._lock:
+            self._pending.pop(token, None)
+            self._written_hashes.pop(token, None)
+        connection = self._connection()
+        connection.execute("DELETE FROM game_sessions WHERE token = ?", (token,))
+        connection.commit()
+
+    def flush(self):
+        """Writes all pending game states in one transaction.
+
+        Entries stay in the pending map until the commit succeeds, so load() never
+        misses a game that is being written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            now = time.time()
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO game_sessions (token, state, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(token) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                    [(token, blob, now) for token, blob in batch.items()],
+                )
+            with self._lock:
+                for token, blob in batch.items():
+                    # Keep states that were queued again while this batch was written
+                    if self._pending.get(token) is blob:
+                        del self._pending[token]
+                    self._written_hashes[token] = _blob_hash(blob)
+                    self._written_hashes.move_to_end(token)
+                while len(self._written_hashes) > WRITTEN_HASH_LIMIT:
+                    self._written_hashes.popitem(last=False)
+
+    def prune(self):
+        """Deletes games that haven't been saved within the TTL."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM game_sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+
+    def _write_behind(self):
+        """Background loop that flushes queued saves and prunes expired games."""
+        last_pruned = 0
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.time() - last_pruned > PRUNE_INTERVAL_SECONDS:
+                    self.prune()
+                    last_pruned = time.time()
+            except sqlite3.Error:
+                # Leave the batch for the next attempt rather than killing the writer
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """Returns the process-wide session store configured by the environment."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.environ.get("MARVEL_SESSION_STORE", "memory").lower()
+            if backend == "sqlite":
+                _store = SQLiteSessionStore(os.environ.get("MARVEL_SESSION_DB", DEFAULT_SQLITE_PATH))
+            elif backend == "memory":
+                _store = MemorySessionStore()
+            else:
+                raise ValueError(f"Unknown session store backend: {backend}")
+            atexit.register(_store.close)
+        return _store
+
+# --- Streamlit Helpers ---
+
+def restore_session(session_state, query_params, keys):
+    """Restores a game from the token in the URL into the session state.
+
+    Returns True if a stored game was found. A session without a token is given a new one.
+    """
+    token = query_params.get(TOKEN_QUERY_PARAM)
+    if token:
+        state = get_session_store().load(token)
+        session_state.session_token = token
+        if state is not None:
+            for key in keys:
+                if key in state:
+                    session_state[key] = state[key]
+            return True
+        return False
+    token = new_token()
+    session_state.session_token = token
+    query_params[TOKEN_QUERY_PARAM] = token
+    return False
+
+def persist_session(session_state, keys):
+    """Queues the current game state for storage under the session's token."""
+    token = session_state.get("session_token")
+    if not token:
+        return
+    state = {key: session_state[key] for key in keys if key in session_state}
+    get_session_store().save(token, state)
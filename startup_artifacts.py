@@ -0,0 +1,66 @@
+# Prebuilt indexes over the character rosters, loaded once per process at startup.
+# The index is serialized to build/roster_index.pkl together with a fingerprint of
+# marvel_roster.py; when the roster changes the index is rebuilt in memory (and
+# rewritten if the directory is writable), so a stale artifact is never used.
+#
+# Usage: python startup_artifacts.py   (builds the artifact, e.g. at image build time)
+
+import functools
+import hashlib
+import os
+import pickle
+
+import marvel_roster
+from bayesian_guesser import build_trait_matrix
+
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "roster_index.pkl")
+# Bump when the layout of the index changes.
+INDEX_VERSION = 1
+
+def roster_fingerprint():
+    """Hashes the roster module's source so a changed roster invalidates the artifact."""
+    with open(marvel_roster.__file__, "rb") as f:
+        return f"{INDEX_VERSION}:{hashlib.sha256(f.read()).hexdigest()}"
+
+def build_roster_index():
+    """Computes the derived structures both apps need from the rosters."""
+    character_names = list(marvel_roster.MARVEL_CHARACTERS.keys())
+    question_keys = list(marvel_roster.COMPUTER_QUESTIONS.keys())
+    return {
+        "fingerprint": roster_fingerprint(),
+        "character_names": character_names,
+        "question_keys": question_keys,
+        "trait_matrix": build_trait_matrix(marvel_roster.MARVEL_CHARACTERS, question_keys),
+        "lowercase_names_by_difficulty": {
+            difficulty: [c["name"].lower() for c in characters]
+            for difficulty, characters in marvel_roster.MARVEL_CHARACTERS_BY_DIFFICULTY.items()
+        },
+    }
+
+def write_roster_index(index, path=ARTIFACT_PATH):
+    """Serializes the index atomically so concurrent replicas never read a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+@functools.lru_cache(maxsize=None)
+def load_roster_index(path=ARTIFACT_PATH):
+    """Loads the prebuilt index, rebuilding it if it's missing or out of date."""
+    try:
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if index.get("fingerprint") == roster_fingerprint():
+            return index
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    index = build_roster_index()
+    try:
+        write_roster_index(index, path)
+    except OSError:
+        pass
+    return index
+
+if __name__ == "__main__":
+    write_roster_index(build_roster_index())
+    print(f"Wrote {ARTIFACT_PATH}")
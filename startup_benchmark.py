@@ -0,0 +1,85 @@
+# Measures cold start: how long the heavy imports take and how long each entry
+# script takes to produce its first render. Every measurement runs in a fresh
+# interpreter so nothing is already cached in sys.modules.
+#
+# Usage: python startup_benchmark.py [--runs 5]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ENTRY_SCRIPTS = ("Marvel_guessing_game.py", "App.py")
+MODULES = (
+    "streamlit",
+    "numpy",
+    "requests",
+    "google.generativeai",
+    "nest_asyncio",
+    "PIL.Image",
+    "marvel_roster",
+    "startup_artifacts",
+)
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({script!r}, default_timeout=60)
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    raise SystemExit(str(app.exception[0].message))
+print(elapsed)
+"""
+
+def _time_snippet(snippet):
+    """Runs a snippet in a fresh interpreter and returns the seconds it printed, or None."""
+    result = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=APP_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def _median(samples):
+    samples = [s for s in samples if s is not None]
+    return statistics.median(samples) if samples else None
+
+def benchmark_imports(runs):
+    """Returns the median cold import time of each module, None if it isn't installed."""
+    return {
+        module: _median([_time_snippet(IMPORT_SNIPPET.format(module=module)) for _ in range(runs)])
+        for module in MODULES
+    }
+
+def benchmark_first_render(runs):
+    """Returns the median time from a fresh interpreter to each script's first render."""
+    return {
+        script: _median([_time_snippet(FIRST_RENDER_SNIPPET.format(script=script)) for _ in range(runs)])
+        for script in ENTRY_SCRIPTS
+    }
+
+def _format(seconds):
+    return "unavailable" if seconds is None else f"{seconds * 1000:8.1f} ms"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark import time and time to first render.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print("Import time (median of cold imports):")
+    for module, seconds in benchmark_imports(args.runs).items():
+        print(f"  {module:<24} {_format(seconds)}")
+    print("\nTime to first render (fresh interpreter, includes imports):")
+    for script, seconds in benchmark_first_render(args.runs).items():
+        print(f"  {script:<24} {_format(seconds)}")
@@ -0,0 +1,6 @@
+# The app modules live at the top level of the repository, next to this folder.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
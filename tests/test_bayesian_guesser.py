@@ -0,0 +1,92 @@
+import numpy as np
+
+import bayesian_guesser
+from marvel_roster import MARVEL_CHARACTERS, COMPUTER_QUESTIONS
+
+NAMES = list(MARVEL_CHARACTERS.keys())
+QUESTION_KEYS = list(COMPUTER_QUESTIONS.keys())
+TRAIT_MATRIX = bayesian_guesser.build_trait_matrix(MARVEL_CHARACTERS, QUESTION_KEYS)
+
+def play(answers):
+    """Applies {question_key: answer} to a new game and returns the log-likelihoods."""
+    log_likelihoods = bayesian_guesser.initial_log_likelihoods(len(NAMES))
+    for key, answer in answers.items():
+        log_likelihoods = bayesian_guesser.update_log_likelihoods(
+            log_likelihoods, TRAIT_MATRIX, QUESTION_KEYS.index(key), answer
+        )
+    return log_likelihoods
+
+def truthful_answers(name):
+    traits = MARVEL_CHARACTERS[name]["traits"]
+    return {key: "Yes" if traits[key] else "No" for key in QUESTION_KEYS if key in traits}
+
+def rank(log_likelihoods, name):
+    """1-based rank of a character, counting only characters with a strictly higher score."""
+    scores = bayesian_guesser.posterior(log_likelihoods)
+    return int((scores > scores[NAMES.index(name)] + 1e-12).sum()) + 1
+
+def test_missing_trait_is_unknown():
+    thor = NAMES.index("Thor")
+    assert TRAIT_MATRIX[thor, QUESTION_KEYS.index("is_human")] == -1
+
+def test_wrong_answer_lowers_rank_but_does_not_eliminate():
+    answers = truthful_answers("Hulk")
+    assert rank(play(answers), "Hulk") == 1
+
+    answers["has_healing_factor"] = "No"  # Hulk does heal
+    log_likelihoods = play(answers)
+    assert rank(log_likelihoods, "Hulk") > 1
+    assert NAMES.index("Hulk") in bayesian_guesser.plausible_candidates(log_likelihoods)
+
+def test_unknown_trait_ranks_thor_first_on_no():
+    answers = truthful_answers("Thor")
+    answers["is_human"] = "No"
+    assert rank(play(answers), "Thor") == 1
+
+    # A "Yes" favours the human look-alikes but doesn't rule Thor out
+    answers["is_human"] = "Yes"
+    log_likelihoods = play(answers)
+    assert rank(log_likelihoods, "Thor") > 1
+    assert NAMES.index("Thor") in bayesian_guesser.plausible_candidates(log_likelihoods)
+
+def test_not_sure_leaves_scores_unchanged():
+    log_likelihoods = play({"is_male": "Yes"})
+    updated = bayesian_guesser.update_log_likelihoods(
+        log_likelihoods, TRAIT_MATRIX, QUESTION_KEYS.index("is_hero"), "Not sure"
+    )
+    np.testing.assert_array_equal(updated, log_likelihoods)
+
+def test_choose_question_skips_asked_questions():
+    log_likelihoods = bayesian_guesser.initial_log_likelihoods(len(NAMES))
+    first = bayesian_guesser.choose_question(log_likelihoods, TRAIT_MATRIX, [])
+    second = bayesian_guesser.choose_question(log_likelihoods, TRAIT_MATRIX, [first])
+    assert first is not None and second not in (None, first)
+
+def test_choose_question_returns_none_when_everything_was_asked():
+    log_likelihoods = bayesian_guesser.initial_log_likelihoods(len(NAMES))
+    asked = range(len(QUESTION_KEYS))
+    assert bayesian_guesser.choose_question(log_likelihoods, TRAIT_MATRIX, asked) is None
+
+def test_choose_question_breaks_ties_by_priority():
+    matrix = np.array([[1, 0], [0, 1]], dtype=np.int8)
+    log_likelihoods = bayesian_guesser.initial_log_likelihoods(2)
+    assert bayesian_guesser.choose_question(log_likelihoods, matrix, [], priority=[0.0, 1.0]) == 1
+    assert bayesian_guesser.choose_question(log_likelihoods, matrix, [], priority=[1.0, 0.0]) == 0
+
+def test_truthful_answers_reach_the_guess_threshold():
+    # Characters the questions can single out are guessed before the questions run out
+    for name in ("Wolverine", "Deadpool", "Captain Marvel", "Spider-Man", "Hulk", "Black Widow"):
+        log_likelihoods = bayesian_guesser.initial_log_likelihoods(len(NAMES))
+        traits = MARVEL_CHARACTERS[name]["traits"]
+        asked = []
+        while True:
+            candidates, confidence = bayesian_guesser.best_candidates(log_likelihoods)
+            if confidence >= bayesian_guesser.GUESS_THRESHOLD:
+                break
+            question = bayesian_guesser.choose_question(log_likelihoods, TRAIT_MATRIX, asked)
+            assert question is not None, f"{name} never reached the threshold"
+            answer = "Yes" if traits[QUESTION_KEYS[question]] else "No"
+            log_likelihoods = bayesian_guesser.update_log_likelihoods(log_likelihoods, TRAIT_MATRIX, question, answer)
+            asked.append(question)
+        assert candidates == [NAMES.index(name)]
+        assert len(asked) < len(QUESTION_KEYS)
@@ -0,0 +1,45 @@
+import sqlite3
+
+import question_analytics
+
+COLUMNS = ("session", "app", "mode", "kind", "turn", "character", "question", "answer", "outcome", "ts")
+
+def event_log(events):
+    connection = sqlite3.connect(":memory:")
+    connection.execute(f"CREATE TABLE game_events ({', '.join(COLUMNS)})")
+    connection.executemany(
+        f"INSERT INTO game_events VALUES ({', '.join('?' for _ in COLUMNS)})",
+        [tuple(event.get(column) for column in COLUMNS) for event in events],
+    )
+    return connection
+
+def test_player_pick_modes_have_no_characters_or_outcomes():
+    events = []
+    for ts, (session, character, answer) in enumerate([("a", "Thor", "Yes"), ("b", "Loki", "No")]):
+        common = {"session": session, "app": "classic", "mode": "computer", "character": character}
+        events.append({**common, "kind": "question", "turn": 1, "question": "is_male", "answer": answer, "ts": ts * 3})
+        events.append({**common, "kind": "guess", "turn": 1, "answer": "Thor", "ts": ts * 3 + 1})
+        # Older logs judged the guess against a random pick the player never saw
+        events.append({**common, "kind": "outcome", "turn": 1, "outcome": "lose", "ts": ts * 3 + 2})
+    events.append({"session": "c", "app": "chat", "mode": "ai_guesses", "kind": "outcome", "turn": 4,
+                   "character": "Hulk", "outcome": "win", "ts": 10})
+
+    tables = question_analytics.compute_tables(event_log(events))
+    assert tables["games"] == 0
+    # Without a known character the score is how evenly the question splits the answers
+    assert tables["computer_questions"]["is_male"]["discrimination"] == 1.0
+    assert tables["computer_questions"]["is_male"]["win_rate"] is None
+    assert tables["failure_points"]["by_mode"] == {}
+    assert tables["failure_points"]["hardest_characters"] == []
+    assert tables["failure_points"]["last_question_before_loss"] == []
+
+def test_user_mode_outcomes_are_counted():
+    common = {"session": "a", "app": "classic", "mode": "user", "character": "Thor"}
+    tables = question_analytics.compute_tables(event_log([
+        {**common, "kind": "question", "turn": 1, "question": "Is your character a god?", "answer": "Yes.", "ts": 0},
+        {**common, "kind": "outcome", "turn": 1, "outcome": "win", "ts": 1},
+    ]))
+    assert tables["games"] == 1
+    assert tables["failure_points"]["by_mode"]["classic/user"]["win_rate"] == 1.0
+    assert tables["failure_points"]["hardest_characters"] == [{"character": "Thor", "games": 1, "win_rate": 1.0}]
+    assert tables["user_questions"][0]["question"] == "is your character a god"
@@ -0,0 +1,51 @@
+import rerun_profiler
+
+def run(session_state, **widget_changes):
+    """Simulates one script run: widgets change, the trigger is detected, the run ends."""
+    session_state.update(widget_changes)
+    return rerun_profiler.detect_trigger(session_state)
+
+def end_run(session_state, **script_changes):
+    session_state.update(script_changes)
+    rerun_profiler.save_snapshot(session_state)
+
+def test_trigger_follows_the_widget_the_user_touched():
+    state = {"user_guess_input": "", "ask_question_button": False, "submit_guess_button": False, "tries_left": 15}
+    assert run(state) == "initial"
+    end_run(state)
+
+    assert run(state, ask_question_button=True) == "ask_question_button"
+    end_run(state, tries_left=14)
+
+    # The button falls back to False and the script's own changes are already in the snapshot
+    assert run(state, ask_question_button=False, user_guess_input="Thor") == "user_guess_input"
+    end_run(state)
+
+    assert run(state, submit_guess_button=True) == "submit_guess_button"
+    end_run(state, tries_left=13, user_guess_input="")
+
+    assert run(state, submit_guess_button=False, user_guess_input="Loki") == "user_guess_input"
+    end_run(state)
+
+def test_reruns_without_a_widget_change():
+    state = {"game_mode": "I'll guess", "start_button": False}
+    run(state)
+    end_run(state)
+    assert run(state) == "rerun"
+    end_run(state, start_button=True)
+    # With nothing else changed, a True -> False change is read as an unticked checkbox
+    assert run(state, start_button=False) == "start_button"
+
+def test_unticked_checkbox_is_a_trigger():
+    state = {"hard_mode": True}
+    run(state)
+    end_run(state)
+    assert run(state, hard_mode=False) == "hard_mode"
+
+def test_profiling_query_param_needs_operator_opt_in(monkeypatch):
+    monkeypatch.delenv("MARVEL_PROFILE", raising=False)
+    monkeypatch.delenv("MARVEL_PROFILE_ALLOW_QUERY", raising=False)
+    assert not rerun_profiler.profiling_enabled({"profile": "1"})
+    monkeypatch.setenv("MARVEL_PROFILE_ALLOW_QUERY", "1")
+    assert rerun_profiler.profiling_enabled({"profile": "1"})
+    assert not rerun_profiler.profiling_enabled({})
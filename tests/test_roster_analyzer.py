@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+import roster_analyzer
+
+def brute_force_nearest(matrix):
+    """Nearest distance counting only traits known for both characters."""
+    nearest = []
+    for i, row in enumerate(matrix):
+        known = (row >= 0) & (matrix >= 0)
+        distances = ((row != matrix) & known).sum(axis=1)
+        distances[i] = matrix.shape[1] + 1
+        nearest.append(distances.min())
+    return np.array(nearest)
+
+def random_matrix(rng, num_characters, num_questions, unknown=0.2):
+    return rng.choice(
+        np.array([-1, 0, 1], dtype=np.int8), size=(num_characters, num_questions),
+        p=[unknown, (1 - unknown) / 2, (1 - unknown) / 2],
+    )
+
+# --- Distances ---
+
+def test_unknown_trait_matches_either_answer():
+    matrix = np.array([[1, -1], [1, 0], [0, 1]], dtype=np.int8)
+    np.testing.assert_array_equal(roster_analyzer.nearest_distances(matrix), [0, 0, 1])
+
+@pytest.mark.parametrize("seed", range(20))
+def test_nearest_distance_strategies_agree(seed):
+    rng = np.random.default_rng(seed)
+    matrix = random_matrix(rng, int(rng.integers(2, 60)), int(rng.integers(1, 9)))
+    expected = brute_force_nearest(matrix)
+    cells, owners = roster_analyzer._completions(matrix)
+    np.testing.assert_array_equal(roster_analyzer._hypercube_nearest(matrix, cells, owners), expected)
+    np.testing.assert_array_equal(roster_analyzer._blocked_nearest(matrix, block_size=7), expected)
+    np.testing.assert_array_equal(roster_analyzer.nearest_distances(matrix), expected)
+
+def test_large_rosters_use_exact_distances():
+    rng = np.random.default_rng(0)
+    matrix = random_matrix(rng, roster_analyzer.PAIRWISE_LIMIT + 500, 12)
+    np.testing.assert_array_equal(roster_analyzer.nearest_distances(matrix), brute_force_nearest(matrix))
+
+# --- Split Tree ---
+
+def test_split_tree_on_a_small_roster():
+    matrix = np.array([
+        [1, 1, 0],
+        [1, 0, 0],
+        [0, 1, -1],
+        [0, 1, 1],
+    ], dtype=np.int8)
+    depth, members, group_ids = roster_analyzer._split_tree(matrix)
+    # Characters 2 and 3 only differ on a trait 2 doesn't know, so "Yes" fits both
+    np.testing.assert_array_equal(depth, [2, 2, -1, -1])
+    np.testing.assert_array_equal(members, [2, 3])
+    assert len(set(group_ids.tolist())) == 1
+
+@pytest.mark.parametrize("seed", range(20))
+def test_split_tree_matches_pairwise_distances(seed):
+    rng = np.random.default_rng(seed)
+    matrix = random_matrix(rng, int(rng.integers(2, 40)), int(rng.integers(0, 8)))
+    distances = roster_analyzer.pairwise_distances(matrix)
+    np.fill_diagonal(distances, matrix.shape[1] + 1)
+    needed = roster_analyzer.questions_needed(matrix)
+    np.testing.assert_array_equal(needed == -1, distances.min(axis=1) == 0)
+
+    # Every pair the answers can't separate shares a group, and only those pairs do
+    groups = [set(group) for group in roster_analyzer.indistinguishable_groups(list(range(len(matrix))), matrix)]
+    for i in range(len(matrix)):
+        for j in range(i + 1, len(matrix)):
+            shared = any(i in group and j in group for group in groups)
+            assert shared == (distances[i, j] == 0)
+
+# --- Real Roster ---
+
+def test_real_roster_groups_and_suggestions():
+    report = roster_analyzer.analyze(*roster_analyzer.load_roster())
+    assert report["indistinguishable_groups"] == [
+        ["Iron Man", "Captain America", "Thor"],
+        ["Black Panther", "Doctor Strange", "Ant-Man"],
+    ]
+    assert report["questions_needed"]["Thor"] == -1
+    assert report["difficulty"]["Thor"] == "Hard"
+
+    suggested = dict(report["suggested_questions"])
+    assert "is_god" in suggested
+    assert {"is_king", "is_sorcerer"} & set(suggested)
+    # Together the suggestions single out every grouped character
+    assert sum(suggested.values()) == 6
+
+def test_suggestions_split_groups_of_the_real_roster():
+    names, matrix, askable, trait_names, _ = roster_analyzer.load_roster()
+    candidates = [trait_names.index(t) for t in ("is_god", "is_king", "is_sorcerer", "is_genius")]
+    filled = matrix.copy()
+    filled[:, candidates] = np.maximum(filled[:, candidates], 0)
+    needed = roster_analyzer.questions_needed(filled[:, list(askable) + candidates])
+    assert (needed >= 0).all()
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+import session_store
+
+class SessionState(dict):
+    """Stands in for st.session_state, which supports both item and attribute access."""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+GAME = {
+    "game_state": "in_progress",
+    "tries_left": 12,
+    "user_question_history": [("Can your character fly?", "No."), ("Is your character a god?", "Yes.")],
+    "computer_question_history": [("is_male", "Yes")],
+}
+KEYS = list(GAME)
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    # A long flush interval keeps the writer thread out of the way; tests flush by hand
+    store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_interval=60)
+    yield store
+    store.close()
+
+def test_encode_round_trip_keeps_tuples():
+    assert session_store.decode_state(session_store.encode_state(GAME)) == GAME
+    restored = session_store.decode_state(session_store.encode_state(GAME))
+    assert isinstance(restored["user_question_history"][0], tuple)
+
+def test_sqlite_pending_save_is_visible_before_flush(sqlite_store):
+    sqlite_store.save("token", GAME)
+    assert sqlite_store.load("token") == GAME
+    sqlite_store.flush()
+    assert sqlite_store._pending == {}
+    assert sqlite_store.load("token") == GAME
+
+def test_sqlite_skips_unchanged_saves(sqlite_store):
+    sqlite_store.save("token", GAME)
+    sqlite_store.flush()
+    sqlite_store.save("token", dict(GAME))
+    assert sqlite_store._pending == {}
+    sqlite_store.save("token", {**GAME, "tries_left": 11})
+    assert "token" in sqlite_store._pending
+
+def test_sqlite_newer_save_during_flush_is_kept(sqlite_store, monkeypatch):
+    sqlite_store.save("token", GAME)
+    newer = {**GAME, "tries_left": 11}
+    connection = sqlite_store._connection()
+
+    class QueueDuringWrite:
+        """Queues a newer state while the batch is being written."""
+
+        def __getattr__(self, name):
+            return getattr(connection, name)
+
+        def __enter__(self):
+            return connection.__enter__()
+
+        def __exit__(self, *exc):
+            return connection.__exit__(*exc)
+
+        def executemany(self, *args):
+            assert sqlite_store.load("token") == GAME
+            sqlite_store.save("token", newer)
+            return connection.executemany(*args)
+
+    monkeypatch.setattr(sqlite_store, "_connection", QueueDuringWrite)
+    sqlite_store.flush()
+    assert sqlite_store._pending["token"] == session_store.encode_state(newer)
+    assert sqlite_store.load("token") == newer
+
+def test_sqlite_expires_old_games(tmp_path):
+    store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_interval=60, ttl=0.05)
+    try:
+        store.save("token", GAME)
+        store.flush()
+        time.sleep(0.1)
+        assert store.load("token") is None
+        store.prune()
+        assert store._connection().execute("SELECT COUNT(*) FROM game_sessions").fetchone()[0] == 0
+    finally:
+        store.close()
+
+def test_memory_store_expires_old_games():
+    store = session_store.MemorySessionStore(ttl=0.05)
+    store.save("token", GAME)
+    assert store.load("token") == GAME
+    time.sleep(0.1)
+    assert store.load("token") is None
+    store.prune()
+    assert store._states == {}
+
+def test_restore_session_from_another_store_instance(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.db")
+    first = session_store.SQLiteSessionStore(path, flush_interval=60)
+    monkeypatch.setattr(session_store, "_store", first)
+    session_state, query_params = SessionState(), {}
+    assert not session_store.restore_session(session_state, query_params, KEYS)
+    session_state.update(GAME)
+    session_store.persist_session(session_state, KEYS)
+    first.close()
+
+    # A fresh store on the same database, e.g. another replica or a restarted process
+    second = session_store.SQLiteSessionStore(path, flush_interval=60)
+    monkeypatch.setattr(session_store, "_store", second)
+    restored = SessionState()
+    try:
+        assert session_store.restore_session(restored, dict(query_params), KEYS)
+    finally:
+        second.close()
+    assert restored.session_token == session_state.session_token
+    assert restored["user_question_history"] == GAME["user_question_history"]
+    assert restored["computer_question_history"] == [("is_male", "Yes")]